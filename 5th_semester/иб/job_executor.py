@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class JobCancelled(Exception):
+    """Задача отменена или вытеснена более новым запросом"""
+
+
+class Job:
+    """
+    Фоновая задача исполнителя
+
+    Функция задачи получает объект Job первым аргументом: через него она
+    сообщает прогресс и проверяет, не отменена ли задача.
+    """
+
+    def __init__(self, key: str, executor: "JobExecutor",
+                 on_progress: Optional[Callable[[float], None]] = None):
+        self.key = key
+        self._executor = executor
+        self._on_progress = on_progress
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Отмена задачи: результат не будет доставлен в интерфейс"""
+        self._cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """Прерывание функции задачи, если задача отменена"""
+        if self.cancelled:
+            raise JobCancelled(self.key)
+
+    def reader(self, text: str) -> "ProgressReader":
+        """Источник для потокового шифра, сообщающий прогресс этой задачи"""
+        return ProgressReader(text, self)
+
+    def progress(self, done: int, total: int) -> None:
+        """Сообщение о прогрессе; заодно проверяется отмена"""
+        self.check_cancelled()
+        if self._on_progress is not None and total:
+            self._executor._deliver(self, self._on_progress, min(done / total, 1.0))
+
+
+class ProgressReader:
+    """
+    Файловый объект поверх строки, сообщающий прогресс при каждом чтении
+
+    Подходит в качестве источника для MagicSquareCipher.encrypt_stream и
+    decrypt_stream: шифр читает текст порциями, и задача после каждой
+    порции обновляет прогресс и проверяет отмену.
+    """
+
+    def __init__(self, text: str, job: Job):
+        self.text = text
+        self.job = job
+        self.position = 0
+
+    def read(self, size: int = -1) -> str:
+        self.job.progress(self.position, len(self.text))
+        end = len(self.text) if size is None or size < 0 else self.position + size
+        chunk = self.text[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+
+class JobExecutor:
+    """
+    Общий исполнитель фоновых задач для GTK-интерфейсов
+
+    Модуль общий для pr1 и pr2: main.py каждой работы загружает его по
+    пути (load_job_executor) и передает исполнитель в интерфейс.
+
+    Задачи выполняются в постоянном пуле потоков. Результат, ошибка и
+    прогресс передаются в главный цикл через dispatch (для GTK -
+    GLib.idle_add; без него обработчики вызываются из рабочего потока).
+    Повторный запрос с тем же ключом вытесняет предыдущий: старая задача
+    отменяется, и в интерфейс попадает только результат последней.
+
+    По умолчанию задачи выполняются одним потоком: вытесненная задача
+    доходит до ближайшей проверки отмены раньше, чем начнется новая, и
+    общие объекты интерфейса (например, кэши MagicSquareCipher, которые
+    не защищены блокировкой) не используются из двух потоков сразу.
+    """
+
+    def __init__(self, workers: int = 1, dispatch: Optional[Callable] = None):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._dispatch = dispatch
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, func: Callable, *args,
+               on_done: Optional[Callable] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[float], None]] = None) -> Job:
+        """
+        Запуск func(job, *args) в фоне
+
+        Returns:
+            Job: задача, которую можно отменить
+        """
+        job = Job(key, self, on_progress)
+        with self._lock:
+            previous = self._jobs.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._jobs[key] = job
+        self._pool.submit(self._run, job, func, args, on_done, on_error)
+        return job
+
+    def cancel(self, key: str) -> bool:
+        """
+        Отмена текущей задачи с ключом key
+
+        Returns:
+            bool: была ли такая задача
+        """
+        with self._lock:
+            job = self._jobs.pop(key, None)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def is_busy(self, key: str) -> bool:
+        """Есть ли незавершенная задача с ключом key"""
+        with self._lock:
+            return key in self._jobs
+
+    def shutdown(self) -> None:
+        """Отмена всех задач и остановка пула"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, func: Callable, args: tuple,
+             on_done: Optional[Callable], on_error: Optional[Callable]) -> None:
+        """Выполнение задачи в рабочем потоке"""
+        if job.cancelled:
+            return
+        try:
+            result = func(job, *args)
+        except JobCancelled:
+            self._finish(job)
+            return
+        except Exception as error:
+            self._deliver(job, on_error, error, final=True)
+            return
+        self._deliver(job, on_done, result, final=True)
+
+    def _deliver(self, job: Job, callback: Optional[Callable], value, final: bool = False) -> None:
+        """Передача значения обработчику в главном цикле"""
+        def handler():
+            if job.cancelled:
+                return False
+            if final:
+                self._finish(job)
+            if callback is not None:
+                callback(value)
+            # False снимает обработчик с GLib.idle_add после одного вызова
+            return False
+
+        if self._dispatch is None:
+            handler()
+        else:
+            self._dispatch(handler)
+
+    def _finish(self, job: Job) -> None:
+        """Удаление завершенной задачи из реестра"""
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
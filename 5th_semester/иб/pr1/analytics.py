@@ -0,0 +1,139 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+Text = Union[str, np.ndarray]
+
+
+def to_codes(text: Text) -> np.ndarray:
+    """Текст -> массив кодов символов (uint32); массив возвращается как есть"""
+    if isinstance(text, np.ndarray):
+        return text
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def unigram_histogram(text: Text) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Частоты символов через np.bincount
+
+    Returns:
+        tuple: (codes: коды встреченных символов, counts: их количества)
+    """
+    codes = to_codes(text)
+    if not len(codes):
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
+    counts = np.bincount(codes)
+    symbols = np.flatnonzero(counts)
+    return symbols.astype(np.uint32), counts[symbols]
+
+
+def bigram_histogram(text: Text) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Частоты пар соседних символов
+
+    Returns:
+        tuple: (pairs: массив (m, 2) кодов, counts: их количества)
+    """
+    codes = to_codes(text).astype(np.int64)
+    if len(codes) < 2:
+        return np.empty((0, 2), dtype=np.uint32), np.empty(0, dtype=np.int64)
+
+    base = int(codes.max()) + 1
+    keys = codes[:-1] * base + codes[1:]
+    if base * base <= 1 << 24:
+        counts = np.bincount(keys)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(keys, return_counts=True)
+    return np.stack([keys // base, keys % base], axis=1).astype(np.uint32), counts
+
+
+def shannon_entropy(text: Text) -> float:
+    """Энтропия Шеннона в битах на символ"""
+    _, counts = unigram_histogram(text)
+    return _entropy_from_counts(counts)
+
+
+def index_of_coincidence(text: Text) -> float:
+    """Индекс совпадений: вероятность, что два случайных символа текста совпадут"""
+    _, counts = unigram_histogram(text)
+    return _coincidence_from_counts(counts)
+
+
+def chi_squared(text: Text, expected: Dict[str, float]) -> float:
+    """
+    Статистика хи-квадрат относительно ожидаемых частот символов
+
+    Учитываются только символы из expected; частоты нормируются на их сумму.
+    """
+    symbols, counts = unigram_histogram(text)
+    lookup = dict(zip(symbols.tolist(), counts.tolist()))
+    observed = np.array([lookup.get(ord(char), 0) for char in expected], dtype=float)
+    probabilities = np.array(list(expected.values()), dtype=float)
+
+    total = observed.sum()
+    if total == 0:
+        return 0.0
+    expected_counts = probabilities / probabilities.sum() * total
+    mask = expected_counts > 0
+    return float((((observed - expected_counts) ** 2)[mask] / expected_counts[mask]).sum())
+
+
+def top_symbols(text: Text, count: int = 5) -> List[Tuple[str, int]]:
+    """Самые частые символы, как Counter.most_common"""
+    symbols, counts = unigram_histogram(text)
+    order = np.argsort(-counts, kind="stable")[:count]
+    return [(chr(symbols[i]), int(counts[i])) for i in order]
+
+
+def corpus_statistics(path: str, chunk_chars: int = 1 << 24,
+                      encoding: str = "utf-8") -> Dict[str, float]:
+    """
+    Статистика большого текстового файла, читаемого порциями
+
+    Счетчики символов накапливаются по порциям, поэтому память не зависит
+    от размера корпуса.
+
+    Returns:
+        dict: length, alphabet_size, entropy, index_of_coincidence
+    """
+    totals: Optional[np.ndarray] = None
+    with open(path, encoding=encoding) as source:
+        while True:
+            chunk = source.read(chunk_chars)
+            if not chunk:
+                break
+            counts = np.bincount(to_codes(chunk))
+            if totals is None:
+                totals = counts
+            else:
+                if len(counts) > len(totals):
+                    totals, counts = counts, totals
+                totals[:len(counts)] += counts
+
+    counts = np.empty(0, dtype=np.int64) if totals is None else totals[totals > 0]
+    return {
+        "length": int(counts.sum()),
+        "alphabet_size": int(len(counts)),
+        "entropy": _entropy_from_counts(counts),
+        "index_of_coincidence": _coincidence_from_counts(counts),
+    }
+
+
+def _entropy_from_counts(counts: np.ndarray) -> float:
+    """Энтропия по массиву частот"""
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    probabilities = counts / total
+    return float(-(probabilities * np.log2(probabilities)).sum())
+
+
+def _coincidence_from_counts(counts: np.ndarray) -> float:
+    """Индекс совпадений по массиву частот"""
+    total = counts.sum()
+    if total < 2:
+        return 0.0
+    counts = counts.astype(float)
+    return float((counts * (counts - 1)).sum() / (total * (total - 1)))
@@ -0,0 +1,295 @@
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, Optional, Union
+
+import numpy as np
+
+from cipher import MagicSquareCipher
+from keyspace import MagicSquareKeyspace, load_keyspace
+
+# Символы с кодом ≥ 128 попадают в одну общую корзину
+NGRAM_ALPHABET_SIZE = 129
+
+
+class BigramModel:
+    """Таблица логарифмов вероятностей биграмм для оценки открытого текста"""
+
+    def __init__(self, log_probs: np.ndarray):
+        self.log_probs = np.asarray(log_probs, dtype=np.float32)
+
+    @classmethod
+    def from_corpus(cls, text: str, smoothing: float = 0.5) -> "BigramModel":
+        """Построение модели по эталонному тексту со сглаживанием"""
+        indices = cls.encode(text)
+        counts = np.bincount(
+            indices[:-1].astype(np.int64) * NGRAM_ALPHABET_SIZE + indices[1:],
+            minlength=NGRAM_ALPHABET_SIZE * NGRAM_ALPHABET_SIZE,
+        ).reshape(NGRAM_ALPHABET_SIZE, NGRAM_ALPHABET_SIZE) + smoothing
+        return cls(np.log(counts / counts.sum(axis=1, keepdims=True)))
+
+    @classmethod
+    def load(cls, path: str) -> "BigramModel":
+        """Загрузка заранее посчитанной таблицы"""
+        return cls(np.load(path))
+
+    def save(self, path: str) -> None:
+        """Сохранение таблицы в файл .npy"""
+        np.save(path, self.log_probs)
+
+    @staticmethod
+    def encode(text: str) -> np.ndarray:
+        """Текст -> индексы символов в алфавите модели"""
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        return np.minimum(codes, NGRAM_ALPHABET_SIZE - 1).astype(np.uint8)
+
+
+def build_reverse_lookup(squares: np.ndarray) -> np.ndarray:
+    """
+    Таблицы обратной подстановки для всех квадратов в алфавите модели
+
+    Строка i переводит индекс символа шифротекста в индекс символа
+    открытого текста для квадрата i. Строится один раз на ключевое
+    пространство: таблица каждого квадрата выводится из его seed.
+
+    Returns:
+        np.ndarray: массив uint8 формы (len(squares), NGRAM_ALPHABET_SIZE)
+    """
+    cipher = MagicSquareCipher()
+    lookup = np.tile(np.arange(NGRAM_ALPHABET_SIZE, dtype=np.uint8), (len(squares), 1))
+    for idx, square in enumerate(squares):
+        table = cipher.create_substitution_table_from_magic_square(np.asarray(square, dtype=int))
+        lookup[idx, [ord(char) for char in table.values()]] = [ord(char) for char in table.keys()]
+    return lookup
+
+
+def load_reverse_lookup(keyspace: MagicSquareKeyspace) -> np.ndarray:
+    """Таблицы обратной подстановки ключевого пространства, кэшируемые рядом с его файлом"""
+    path = keyspace.path + ".sub.npy"
+    if os.path.exists(path):
+        lookup = np.load(path, mmap_mode="r")
+        if lookup.shape == (len(keyspace), NGRAM_ALPHABET_SIZE):
+            return lookup
+    lookup = build_reverse_lookup(keyspace.squares)
+    np.save(path, lookup)
+    return lookup
+
+
+def score_squares(squares: np.ndarray, blocks: np.ndarray, log_probs: np.ndarray,
+                  lookup: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Оценка пакета квадратов-кандидатов по образцу шифротекста
+
+    Образец (blocks формы (B, n²), индексы символов) расшифровывается всеми
+    кандидатами сразу одной выборкой по индексам. Для шифра с подстановкой
+    передаются строки таблицы build_reverse_lookup для этих квадратов.
+    Оценка - средний логарифм вероятности биграммы в полученном тексте.
+
+    Returns:
+        np.ndarray: оценки формы (k,)
+    """
+    k = len(squares)
+    inverses = np.asarray(squares, dtype=np.intp).reshape(k, -1) - 1
+
+    decrypted = blocks[:, inverses].transpose(1, 0, 2).reshape(k, -1)
+    if lookup is not None:
+        decrypted = np.take_along_axis(np.asarray(lookup), decrypted, axis=1)
+
+    return log_probs[decrypted[:, :-1], decrypted[:, 1:]].mean(axis=1)
+
+
+_worker_log_probs = None
+
+
+def _init_worker(log_probs: np.ndarray) -> None:
+    """Передача таблицы модели в процесс пула один раз"""
+    global _worker_log_probs
+    _worker_log_probs = log_probs
+
+
+def _score_batch(start: int, squares: np.ndarray, blocks: np.ndarray,
+                 lookup: Optional[np.ndarray]):
+    """Задача пула: оценка одного пакета кандидатов"""
+    return start, score_squares(squares, blocks, _worker_log_probs, lookup)
+
+
+class SquareKeyAttack:
+    """
+    Атака по одному шифротексту перебором ключевого пространства
+
+    Кандидаты оцениваются пакетами по batch_size в пуле процессов. Если
+    задан порог threshold, перебор прекращается, как только лучший
+    кандидат его достигает.
+    """
+
+    def __init__(self, model: BigramModel, keyspace: Union[MagicSquareKeyspace, np.ndarray],
+                 workers: Optional[int] = None, batch_size: int = 512):
+        self.model = model
+        self.keyspace = keyspace
+        self.squares = keyspace.squares if isinstance(keyspace, MagicSquareKeyspace) else keyspace
+        self.n = self.squares.shape[1]
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.cipher = MagicSquareCipher()
+        self._reverse_lookup: Optional[np.ndarray] = None
+
+    @property
+    def reverse_lookup(self) -> np.ndarray:
+        """Таблицы обратной подстановки, строятся при первой атаке с подстановкой"""
+        if self._reverse_lookup is None:
+            if isinstance(self.keyspace, MagicSquareKeyspace):
+                self._reverse_lookup = load_reverse_lookup(self.keyspace)
+            else:
+                self._reverse_lookup = build_reverse_lookup(self.squares)
+        return self._reverse_lookup
+
+    def run(self, ciphertext: str, use_sub: bool = False, top: int = 10,
+            threshold: Optional[float] = None, sample_blocks: int = 64) -> List[dict]:
+        """
+        Ранжирование кандидатов для образца шифротекста
+
+        Returns:
+            list: лучшие кандидаты (index, score, square, plaintext) по убыванию оценки
+        """
+        block_size = self.n * self.n
+        sample = ciphertext[:block_size * sample_blocks]
+        sample += self.cipher.padding_char * (-len(sample) % block_size)
+        blocks = BigramModel.encode(sample).reshape(-1, block_size)
+
+        scores = np.full(len(self.squares), -np.inf, dtype=np.float32)
+        batches = range(0, len(self.squares), self.batch_size)
+        lookup = self.reverse_lookup if use_sub else None
+
+        def batch_lookup(start: int) -> Optional[np.ndarray]:
+            return None if lookup is None else np.asarray(lookup[start:start + self.batch_size])
+
+        if self.workers <= 1:
+            for start in batches:
+                batch = np.asarray(self.squares[start:start + self.batch_size])
+                scores[start:start + len(batch)] = score_squares(
+                    batch, blocks, self.model.log_probs, batch_lookup(start)
+                )
+                if threshold is not None and scores.max() >= threshold:
+                    break
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.model.log_probs,)
+            ) as pool:
+                pending = {
+                    pool.submit(_score_batch, start,
+                                np.asarray(self.squares[start:start + self.batch_size]), blocks,
+                                batch_lookup(start))
+                    for start in batches
+                }
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        start, batch_scores = future.result()
+                        scores[start:start + len(batch_scores)] = batch_scores
+                    if threshold is not None and scores.max() >= threshold:
+                        for future in pending:
+                            future.cancel()
+                        break
+
+        ranked = np.argsort(scores)[::-1][:top]
+        results = []
+        for index in ranked:
+            if not np.isfinite(scores[index]):
+                break
+            square = np.asarray(self.squares[index]).astype(int)
+            results.append({
+                "index": int(index),
+                "score": float(scores[index]),
+                "square": square,
+                "plaintext": self.cipher.decrypt_with_square(sample, square, use_sub),
+            })
+        return results
+
+
+def recover_square(plain: str, cipher: str, n: int) -> np.ndarray:
+    """
+    Восстановление квадрата по известной паре открытый текст / шифротекст
+
+    Перестановка одинакова для всех блоков, поэтому столбец шифротекста p
+    (символы позиции p во всех блоках) совпадает со столбцом открытого
+    текста, который на нее переходит. Столбцы обоих текстов сопоставляются
+    целиком через np.unique - пересечение кандидатов сразу по всем блокам,
+    O(n²·blocks) работы без перебора. Шифр с подстановкой не поддерживается.
+
+    Returns:
+        np.ndarray: магический квадрат n x n
+
+    Raises:
+        ValueError: шифротекст не является перестановкой открытого текста;
+            столбцы открытого текста совпадают (мало блоков) и перестановка
+            определяется неоднозначно; найденная перестановка не дает
+            магического квадрата
+    """
+    block_size = n * n
+    blocks = min(len(plain), len(cipher)) // block_size
+    if blocks == 0:
+        raise ValueError(f"Нужен хотя бы один полный блок из {block_size} символов")
+
+    def columns(text: str) -> np.ndarray:
+        codes = np.frombuffer(text[:blocks * block_size].encode("utf-32-le"), dtype=np.uint32)
+        return np.ascontiguousarray(codes.reshape(blocks, block_size).T)
+
+    # Каждый столбец - одна запись фиксированной длины, сравнимая целиком
+    both = np.concatenate([columns(plain), columns(cipher)])
+    keys = both.view(np.dtype((np.void, both.dtype.itemsize * blocks))).ravel()
+    _, labels = np.unique(keys, return_inverse=True)
+    plain_labels, cipher_labels = labels[:block_size], labels[block_size:]
+
+    # k-й столбец шифротекста с данной меткой сопоставляется k-му столбцу
+    # открытого текста с той же меткой
+    plain_order = np.argsort(plain_labels, kind="stable")
+    cipher_order = np.argsort(cipher_labels, kind="stable")
+    if not np.array_equal(plain_labels[plain_order], cipher_labels[cipher_order]):
+        raise ValueError("Шифротекст не является перестановкой блоков открытого текста")
+
+    # Одинаковые столбцы открытого текста можно переставить между собой -
+    # данные согласуются с несколькими квадратами
+    distinct = len(np.unique(plain_labels))
+    if distinct < block_size:
+        raise ValueError(
+            f"Перестановка определяется неоднозначно: различных столбцов открытого "
+            f"текста {distinct} из {block_size}, нужно больше блоков (сейчас {blocks})"
+        )
+
+    forward = np.empty(block_size, dtype=np.intp)
+    forward[cipher_order] = plain_order
+
+    square = np.empty(block_size, dtype=int)
+    square[forward] = np.arange(1, block_size + 1)
+    square = square.reshape(n, n)
+
+    is_valid, message = MagicSquareCipher().validate_magic_square(square)
+    if not is_valid:
+        raise ValueError(f"Восстановленная перестановка не является магическим квадратом: {message}")
+    return square
+
+
+def main():
+    """Запуск атаки из командной строки"""
+    parser = argparse.ArgumentParser(description="Атака по шифротексту на малые магические квадраты")
+    parser.add_argument("ciphertext", help="файл с шифротекстом")
+    parser.add_argument("--corpus", required=True, help="эталонный текст для модели биграмм")
+    parser.add_argument("--n", type=int, default=4, help="размер квадрата (3 или 4)")
+    parser.add_argument("--sub", action="store_true", help="шифр с подстановкой")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--threshold", type=float, help="порог оценки для досрочной остановки")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as corpus:
+        model = BigramModel.from_corpus(corpus.read())
+    with open(args.ciphertext, encoding="utf-8") as source:
+        ciphertext = source.read()
+
+    attack = SquareKeyAttack(model, load_keyspace(args.n), workers=args.workers)
+    for result in attack.run(ciphertext, args.sub, args.top, args.threshold):
+        print(f"#{result['index']:5d}  {result['score']:.4f}  {result['plaintext'][:60]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import json
+import platform
+import string
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from cipher import MagicSquareCipher
+
+# Сетка по умолчанию; полная (n = 3..64, текст от 1 КБ до 100 МБ)
+# задается через --n и --sizes
+DEFAULT_SIZES = [1 << 16, 1 << 20, 16 << 20]
+DEFAULT_N_VALUES = [3, 4, 5, 8, 16, 32, 64]
+
+# Меньшие тексты шифруются за микросекунды - их замеры слишком шумные,
+# чтобы сравнивать их с эталоном
+REGRESSION_MIN_SIZE = 1 << 20
+
+# Однобайтовый алфавит: размер текста в символах совпадает с размером в байтах
+BENCHMARK_ALPHABET = string.ascii_letters + string.digits + " .,"
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    """Случайный текст заданной длины из однобайтовых символов"""
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(BENCHMARK_ALPHABET.encode("ascii"), dtype=np.uint8)
+    return rng.choice(alphabet, size).tobytes().decode("ascii")
+
+
+def measure(func, repeat: int) -> float:
+    """Лучшее время из repeat запусков"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(n_values: Sequence[int] = DEFAULT_N_VALUES,
+                  sizes: Sequence[int] = DEFAULT_SIZES,
+                  use_sub_values: Sequence[bool] = (False, True),
+                  repeat: int = 3, seed: int = 1) -> List[dict]:
+    """
+    Замер скорости encrypt/decrypt по сетке параметров
+
+    Ключ фиксируется seed, поэтому расписание ключа строится один раз при
+    прогреве и в замер не входит. По той же причине метод генерации на
+    скорость не влияет и в сетку не входит: после прогрева все методы
+    идут по одному пути шифрования (их сравнивает run_key_schedule_benchmark).
+    Для каждой точки берется лучшее время из repeat запусков.
+
+    Returns:
+        list: записи n, use_sub, size, encrypt_mbps, decrypt_mbps
+    """
+    cipher = MagicSquareCipher()
+    results = []
+
+    for size in sizes:
+        text = make_text(size)
+        # Для больших текстов один запуск занимает секунды - повторы не нужны
+        runs = repeat if size < 16 << 20 else 1
+        for n in n_values:
+            for use_sub in use_sub_values:
+                encrypted = cipher.encrypt(text, n, use_sub, "classic", seed)
+                encrypt_time = measure(lambda: cipher.encrypt(text, n, use_sub, "classic", seed), runs)
+                decrypt_time = measure(lambda: cipher.decrypt(encrypted, n, use_sub, "classic", seed), runs)
+                results.append({
+                    "n": n,
+                    "use_sub": use_sub,
+                    "size": size,
+                    "encrypt_mbps": size / encrypt_time / 1e6,
+                    "decrypt_mbps": size / decrypt_time / 1e6,
+                })
+    return results
+
+
+def run_key_schedule_benchmark(n_values: Sequence[int] = DEFAULT_N_VALUES,
+                               methods: Optional[Sequence[str]] = None,
+                               repeat: int = 3, seed: int = 1) -> List[dict]:
+    """
+    Замер построения расписания ключа (генерация квадрата и таблиц) по методам
+
+    Каждый запуск идет на новом экземпляре шифра, поэтому кэш расписаний
+    не срабатывает и измеряется холодное построение.
+
+    Returns:
+        list: записи n, method, schedule_ms
+    """
+    methods = list(methods or MagicSquareCipher().get_available_methods())
+    results = []
+    for method in methods:
+        for n in n_values:
+            schedule_time = measure(lambda: MagicSquareCipher().get_key_schedule(n, method, seed), repeat)
+            results.append({"n": n, "method": method, "schedule_ms": schedule_time * 1e3})
+    return results
+
+
+def environment_info() -> Dict[str, str]:
+    """Сведения об окружении, в котором выполнялся замер"""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+    }
+
+
+def compare_results(results: List[dict], baseline: List[dict],
+                    tolerance: float = 0.2, min_size: int = REGRESSION_MIN_SIZE) -> List[dict]:
+    """
+    Сравнение замеров с эталонными
+
+    Точка считается регрессией, если скорость упала больше чем на долю
+    tolerance от эталона. Точки, которых нет в эталоне, и тексты меньше
+    min_size (время слишком мало для надежного замера) пропускаются.
+
+    Returns:
+        list: регрессии (параметры точки, метрика, эталон, текущее значение)
+    """
+    def key(entry: dict) -> tuple:
+        return entry["n"], entry["use_sub"], entry["size"]
+
+    reference = {key(entry): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        expected = reference.get(key(entry))
+        if expected is None or entry["size"] < min_size:
+            continue
+        for metric in ("encrypt_mbps", "decrypt_mbps"):
+            if entry[metric] < expected[metric] * (1 - tolerance):
+                regressions.append({
+                    "n": entry["n"],
+                    "use_sub": entry["use_sub"],
+                    "size": entry["size"],
+                    "metric": metric,
+                    "baseline": expected[metric],
+                    "current": entry[metric],
+                })
+    return regressions
+
+
+def main():
+    """Запуск замеров из командной строки; код возврата 1 при регрессии"""
+    parser = argparse.ArgumentParser(description="Замер скорости шифра магического квадрата")
+    parser.add_argument("--n", type=int, nargs="+", default=DEFAULT_N_VALUES, help="размеры квадрата")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="размеры текста в байтах")
+    parser.add_argument("--methods", nargs="+", help="методы генерации для замера расписания ключа (по умолчанию все)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark.json", help="файл для результатов")
+    parser.add_argument("--baseline", help="файл эталонных результатов для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое падение скорости (доля)")
+    parser.add_argument("--min-size", type=int, default=REGRESSION_MIN_SIZE,
+                        help="наименьший размер текста, сравниваемый с эталоном")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.n, args.sizes, repeat=args.repeat)
+    schedules = run_key_schedule_benchmark(args.n, args.methods, repeat=args.repeat)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump({"environment": environment_info(), "results": results,
+                   "key_schedules": schedules}, output, indent=2)
+    print(f"Записано замеров: {len(results) + len(schedules)} -> {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as source:
+            baseline = json.load(source)["results"]
+        regressions = compare_results(results, baseline, args.tolerance, args.min_size)
+        for item in regressions:
+            print(f"n={item['n']:2d} sub={item['use_sub']!s:5} "
+                  f"{item['size']:>10} {item['metric']}: {item['baseline']:.1f} -> {item['current']:.1f} МБ/с")
+        if regressions:
+            print(f"Регрессий: {len(regressions)}")
+            sys.exit(1)
+        print("Регрессий нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,39 @@
+import itertools
+import math
 import numpy as np
+import os
 import random
-from typing import List, Tuple, Optional
+import struct
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import IO, List, Tuple, Optional, Union
+
+SUBSTITUTION_ALPHABET = (
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 .,!?-()[]{}:;'\""
+)
+
+# Трейлер файла, зашифрованного MagicSquareCipher.encrypt_file:
+# исходный размер файла, размер блока (n*n) и метка
+FILE_TRAILER_MAGIC = b"MSQ2"
+FILE_TRAILER_FORMAT = "<QI"
+
+# Байт на символ во внутреннем представлении текста (коды UTF-32)
+TEXT_CODE_BYTES = 4
+
+# Наибольшее число преобразований, при котором generate_magic_squares
+# перебирает орбиту базового квадрата полностью, а не выборкой
+ORBIT_ENUMERATION_LIMIT = 1 << 13
+
+
+def dihedral_index_maps(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Индексы строк и столбцов для 8 симметрий квадрата, формы (8, n, n)"""
+    i, j = np.indices((n, n))
+    ri, rj = n - 1 - i, n - 1 - j
+    rows = np.stack([i, j, ri, rj, j, i, ri, rj])
+    cols = np.stack([j, ri, rj, i, i, rj, j, ri])
+    return rows, cols
 
 
 class MagicSquareCipher:
@@ -9,6 +42,16 @@ class MagicSquareCipher:
     def __init__(self):
         self.padding_char = "~"
         self.substitution_key = None
+        self.substitution_cache_size = 64
+        self._substitution_cache = OrderedDict()
+        self.key_schedule_cache_size = 32
+        self._key_schedule_cache = OrderedDict()
+        self.key_schedule_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # Параллельная перестановка блоков: None - по числу ядер, 1 - отключена
+        self.workers = None
+        self.parallel_threshold = 8 * 1024 * 1024
+        # Профилировщик этапов (StageProfiler или объект с методом record)
+        self.profiler = None
 
     def validate_magic_square(self, square: np.ndarray, check_uniqueness: bool = True) -> Tuple[bool, str]:
         """
@@ -25,32 +68,62 @@ class MagicSquareCipher:
         
         if square.shape != (n, n):
             return False, f"Квадрат должен быть размером {n}x{n}"
-        
+
+        mask, reasons = self.validate_magic_squares(square[np.newaxis], check_uniqueness)
+        return bool(mask[0]), reasons[0]
+
+    def validate_magic_squares(self, squares: np.ndarray,
+                               check_uniqueness: bool = True) -> Tuple[np.ndarray, List[str]]:
+        """
+        Пакетная проверка стопки квадратов формы (k, n, n)
+
+        Суммы строк, столбцов и диагоналей считаются редукциями по осям сразу
+        для всей стопки. Для каждого квадрата возвращается причина первой
+        найденной ошибки, как в validate_magic_square.
+
+        Returns:
+            tuple: (mask: np.ndarray[bool] формы (k,), reasons: List[str])
+        """
+        squares = np.asarray(squares, dtype=np.int64)
+        k, n = squares.shape[0], squares.shape[1]
+        flat = squares.reshape(k, n * n)
+
+        duplicated = np.zeros(k, dtype=bool)
         if check_uniqueness:
-            all_numbers = square.flatten()
-            if len(set(all_numbers)) != n * n:
-                return False, "Все числа в квадрате должны быть уникальными"
-        
-        magic_sum = np.sum(square[0, :])
-        
-        # Проверка строк
-        for i in range(n):
-            if np.sum(square[i, :]) != magic_sum:
-                return False, f"Строка {i+1} имеет неправильную сумму"
-        
-        # Проверка столбцов
-        for j in range(n):
-            if np.sum(square[:, j]) != magic_sum:
-                return False, f"Столбец {j+1} имеет неправильную сумму"
-        
-        # Проверка диагоналей
-        if np.sum(np.diag(square)) != magic_sum:
-            return False, "Главная диагональ имеет неправильную сумму"
-        
-        if np.sum(np.diag(np.fliplr(square))) != magic_sum:
-            return False, "Побочная диагональ имеет неправильную сумму"
-        
-        return True, f"Квадрат корректен! Магическая сумма: {magic_sum}"
+            if flat.size and flat.min() >= 1 and flat.max() <= n * n:
+                # Числа 1..n² - повтор виден по счетчикам bincount
+                offsets = (flat - 1) + np.arange(k)[:, np.newaxis] * (n * n)
+                counts = np.bincount(offsets.ravel(), minlength=k * n * n)
+                duplicated = (counts.reshape(k, n * n) != 1).any(axis=1)
+            else:
+                duplicated = (np.diff(np.sort(flat, axis=1), axis=1) == 0).any(axis=1)
+
+        row_sums = squares.sum(axis=2)
+        col_sums = squares.sum(axis=1)
+        magic_sums = row_sums[:, 0]
+        bad_rows = row_sums != magic_sums[:, np.newaxis]
+        bad_cols = col_sums != magic_sums[:, np.newaxis]
+        bad_diag = np.einsum("kii->k", squares) != magic_sums
+        bad_anti = np.einsum("kii->k", squares[:, :, ::-1]) != magic_sums
+
+        mask = ~(duplicated | bad_rows.any(axis=1) | bad_cols.any(axis=1) | bad_diag | bad_anti)
+
+        reasons = []
+        for idx in range(k):
+            if duplicated[idx]:
+                reasons.append("Все числа в квадрате должны быть уникальными")
+            elif bad_rows[idx].any():
+                reasons.append(f"Строка {int(np.argmax(bad_rows[idx])) + 1} имеет неправильную сумму")
+            elif bad_cols[idx].any():
+                reasons.append(f"Столбец {int(np.argmax(bad_cols[idx])) + 1} имеет неправильную сумму")
+            elif bad_diag[idx]:
+                reasons.append("Главная диагональ имеет неправильную сумму")
+            elif bad_anti[idx]:
+                reasons.append("Побочная диагональ имеет неправильную сумму")
+            else:
+                reasons.append(f"Квадрат корректен! Магическая сумма: {magic_sums[idx]}")
+
+        return mask, reasons
 
     def generate_magic_square(self, n: int, method: str = "random", 
                             seed: Optional[int] = None, 
@@ -66,19 +139,22 @@ class MagicSquareCipher:
         max_attempts = 10
         for attempt in range(max_attempts):
             try:
-                if method == "classic":
-                    square = self._classic_magic_square(n)
-                elif method == "random":
-                    square = self._classic_with_safe_transformations(n)
-                elif method == "arithmetic":
-                    square = self._arithmetic_progression_square(n, magic_sum)
-                elif method == "geometric":
-                    square = self._modular_magic_square(n, magic_sum)
-                else:
-                    square = self._classic_magic_square(n)
+                square_bytes = n * n * np.dtype(np.int64).itemsize
+                with self._stage("generation", square_bytes):
+                    if method == "classic":
+                        square = self._classic_magic_square(n)
+                    elif method == "random":
+                        square = self._classic_with_safe_transformations(n)
+                    elif method == "arithmetic":
+                        square = self._arithmetic_progression_square(n, magic_sum)
+                    elif method == "geometric":
+                        square = self._modular_magic_square(n, magic_sum)
+                    else:
+                        square = self._classic_magic_square(n)
                 
                 # Проверяем, что квадрат корректен
-                is_valid, message = self.validate_magic_square(square)
+                with self._stage("validation", square_bytes):
+                    is_valid, message = self.validate_magic_square(square)
                 if is_valid:
                     return square
                     
@@ -88,6 +164,140 @@ class MagicSquareCipher:
         # Если не удалось сгенерировать корректный квадрат, возвращаем классический
         return self._classic_magic_square(n)
 
+    def generate_magic_squares(self, n: int, count: int, method: str = "random",
+                               rng: Optional[np.random.Generator] = None,
+                               magic_sum: Optional[int] = None) -> np.ndarray:
+        """
+        Пакетная генерация различных магических квадратов формы (count, n, n)
+
+        Базовый квадрат метода размножается преобразованиями, сохраняющими
+        магические свойства: симметричными перестановками строк и столбцов
+        (σ(n-1-i) = n-1-σ(i)), дополнением до n²+1 и восемью элементами
+        группы диэдра. Все преобразования применяются к пакету одной
+        выборкой по индексам, повторы отбрасываются. Если преобразований
+        не больше ORBIT_ENUMERATION_LIMIT, орбита базового квадрата
+        перебирается полностью и count квадратов выбираются из нее, иначе
+        преобразования выбираются случайно. Результат полностью
+        определяется rng.
+
+        Raises:
+            ValueError: различных квадратов, достижимых преобразованиями,
+                меньше count (например, для n = 3 их всего 8; полный набор
+                квадратов n <= 4 дает keyspace.load_keyspace)
+        """
+        rng = np.random.default_rng(rng)
+        # Для "random" базой служит классический квадрат: случайные
+        # преобразования метода (на глобальном random) заменяются
+        # преобразованиями пакета на rng
+        base_method = "classic" if method == "random" else method
+        base = self.generate_magic_square(n, base_method, None, magic_sum)
+
+        half = n // 2
+        transforms = 16 * 2 ** half * math.factorial(half)
+        if transforms <= ORBIT_ENUMERATION_LIMIT:
+            found = self._square_orbit(base)
+        else:
+            found = self._sample_square_orbit(base, count, rng)
+
+        if len(found) < count:
+            raise ValueError(
+                f"Преобразованиями квадрата {n}x{n} ({method}) достижимо только "
+                f"{len(found)} различных квадратов, запрошено {count}"
+            )
+        found = found[rng.permutation(len(found))[:count]]
+        return found.reshape(-1, n, n)
+
+    def _transform_squares(self, base: np.ndarray, sigma: np.ndarray,
+                           element: np.ndarray, complemented: np.ndarray) -> np.ndarray:
+        """
+        Пакет образов base: симметричная перестановка sigma, элемент группы
+        диэдра element и дополнение до n²+1 там, где complemented
+
+        Returns:
+            np.ndarray: квадраты в виде строк формы (len(sigma), n*n)
+        """
+        n = len(base)
+        batch = len(sigma)
+        dihedral_rows, dihedral_cols = dihedral_index_maps(n)
+        squares = base[sigma[:, :, np.newaxis], sigma[:, np.newaxis, :]]
+        squares = squares[
+            np.arange(batch)[:, np.newaxis, np.newaxis],
+            dihedral_rows[element],
+            dihedral_cols[element],
+        ]
+        squares[complemented] = n * n + 1 - squares[complemented]
+        return squares.reshape(batch, n * n)
+
+    def _square_orbit(self, base: np.ndarray) -> np.ndarray:
+        """Все различные образы base при преобразованиях generate_magic_squares"""
+        n = len(base)
+        half = n // 2
+        pairs = np.array(list(itertools.permutations(range(half))), dtype=np.intp).reshape(-1, half)
+        flips = np.array(list(itertools.product((False, True), repeat=half)), dtype=bool).reshape(-1, half)
+        pairs = np.repeat(pairs, len(flips), axis=0)
+        flips = np.tile(flips, (len(pairs) // len(flips), 1))
+        sigma = self._symmetric_permutations(n, pairs, flips)
+
+        found = np.empty((0, n * n), dtype=base.dtype)
+        for element in range(8):
+            for complemented in (False, True):
+                squares = self._transform_squares(
+                    base, sigma,
+                    np.full(len(sigma), element),
+                    np.full(len(sigma), complemented),
+                )
+                found = np.unique(np.concatenate([found, squares]), axis=0)
+        return found
+
+    def _sample_square_orbit(self, base: np.ndarray, count: int,
+                             rng: np.random.Generator) -> np.ndarray:
+        """Не меньше count различных образов base, если столько найдется, случайной выборкой"""
+        n = len(base)
+        found = np.empty((0, n * n), dtype=base.dtype)
+        stale_rounds = 0
+        while len(found) < count and stale_rounds < 3:
+            batch = max(count - len(found), 8)
+            squares = self._transform_squares(
+                base,
+                self._random_symmetric_permutations(n, batch, rng),
+                rng.integers(0, 8, size=batch),
+                rng.integers(0, 2, size=batch).astype(bool),
+            )
+            previous = len(found)
+            found = np.unique(np.concatenate([found, squares]), axis=0)
+            stale_rounds = stale_rounds + 1 if len(found) == previous else 0
+        return found
+
+    def _random_symmetric_permutations(self, n: int, count: int,
+                                       rng: np.random.Generator) -> np.ndarray:
+        """
+        Случайные перестановки σ индексов 0..n-1, перестановочные с отражением
+
+        Пары (i, n-1-i) переставляются между собой и независимо меняются
+        местами внутри пары, центральный индекс нечетного n остается на месте.
+        """
+        half = n // 2
+        pairs = rng.permuted(np.tile(np.arange(half), (count, 1)), axis=1)
+        flipped = rng.integers(0, 2, size=(count, half)).astype(bool)
+        return self._symmetric_permutations(n, pairs, flipped)
+
+    def _symmetric_permutations(self, n: int, pairs: np.ndarray,
+                                flipped: np.ndarray) -> np.ndarray:
+        """
+        Перестановки σ по порядку пар pairs и флагам обмена внутри пар flipped
+
+        Returns:
+            np.ndarray: перестановки формы (len(pairs), n)
+        """
+        half = n // 2
+        count = len(pairs)
+        sigma = np.empty((count, n), dtype=np.intp)
+        sigma[:, :half] = np.where(flipped, n - 1 - pairs, pairs)
+        sigma[:, n - half:] = (n - 1 - sigma[:, :half])[:, ::-1]
+        if n % 2 == 1:
+            sigma[:, half] = half
+        return sigma
+
     def _classic_with_safe_transformations(self, n: int) -> np.ndarray:
         """Классический квадрат с безопасными преобразованиями"""
         base = self._classic_magic_square(n)
@@ -111,7 +321,7 @@ class MagicSquareCipher:
         # Если числа уже в правильном диапазоне, возвращаем как есть
         if current_min >= 1 and np.max(square) <= n * n:
             # Проверяем уникальность
-            if len(set(square.flatten())) == n * n:
+            if np.unique(square).size == n * n:
                 return square
         
         # Создаем новый классический квадрат и переносим магические свойства
@@ -144,34 +354,23 @@ class MagicSquareCipher:
             return self._singly_even_magic_square(n)
 
     def _odd_magic_square(self, n: int) -> np.ndarray:
-        """Генерация магического квадрата для нечетного n"""
-        magic_square = np.zeros((n, n), dtype=int)
-        i, j = 0, n // 2
-
-        for num in range(1, n * n + 1):
-            magic_square[i, j] = num
-            new_i, new_j = (i - 1) % n, (j + 1) % n
-
-            if magic_square[new_i, new_j] != 0:
-                i = (i + 1) % n
-            else:
-                i, j = new_i, new_j
+        """
+        Генерация магического квадрата для нечетного n
 
-        return magic_square
+        Сиамский метод в замкнутой форме: номер "витка" и смещение в нем
+        выражаются через индексы клетки, весь квадрат строится за O(n²).
+        """
+        i, j = np.indices((n, n))
+        return n * ((i + j + n // 2 + 1) % n) + (i + 2 * j + 1) % n + 1
 
     def _doubly_even_magic_square(self, n: int) -> np.ndarray:
         """Генерация магического квадрата для n кратного 4"""
-        magic_square = np.arange(1, n * n + 1).reshape(n, n)
+        i, j = np.indices((n, n))
+        magic_square = i * n + j + 1
 
-        for i in range(0, n, 4):
-            for j in range(0, n, 4):
-                for k in range(4):
-                    magic_square[i + k, j + k] = n * n + 1 - magic_square[i + k, j + k]
-                    magic_square[i + k, j + 3 - k] = (
-                        n * n + 1 - magic_square[i + k, j + 3 - k]
-                    )
-
-        return magic_square
+        # В каждом блоке 4x4 дополняются до n²+1 клетки обеих диагоналей
+        diagonal = (i % 4 == j % 4) | ((i % 4) + (j % 4) == 3)
+        return np.where(diagonal, n * n + 1 - magic_square, magic_square)
 
     def _singly_even_magic_square(self, n: int) -> np.ndarray:
         """Генерация магического квадрата для n = 4k + 2"""
@@ -186,27 +385,20 @@ class MagicSquareCipher:
         magic_square[:size, size:] = sub_square + 2 * size * size
         magic_square[size:, :size] = sub_square + 3 * size * size
 
-        # Корректировка для магического квадрата
+        # Корректировка для магического квадрата: маска клеток верхней
+        # половины, которые меняются местами с клетками нижней
         k = (n - 2) // 4
+        swap = np.zeros((size, n), dtype=bool)
+        swap[:, :k] = True
+        swap[size // 2, :k] = False
+        swap[size // 2, k:2 * k] = True
+        if k > 1:
+            swap[:, n - k + 1:] = True
 
-        for i in range(size):
-            for j in range(k):
-                if i == size // 2:
-                    j_swap = j + k
-                else:
-                    j_swap = j
-
-                magic_square[i, j_swap], magic_square[i + size, j_swap] = (
-                    magic_square[i + size, j_swap],
-                    magic_square[i, j_swap],
-                )
-
-        for i in range(size):
-            for j in range(k - 1):
-                magic_square[i, n - j - 1], magic_square[i + size, n - j - 1] = (
-                    magic_square[i + size, n - j - 1],
-                    magic_square[i, n - j - 1],
-                )
+        top = magic_square[:size].copy()
+        bottom = magic_square[size:]
+        magic_square[:size] = np.where(swap, bottom, top)
+        magic_square[size:] = np.where(swap, top, bottom)
 
         return magic_square
 
@@ -284,19 +476,42 @@ class MagicSquareCipher:
 
     def create_substitution_table_from_magic_square(self, magic_square: np.ndarray) -> dict:
         """Создание таблицы подстановки на основе магического квадрата"""
-        chars = list(
-            set(
-                "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 .,!?-()[]{}:;'\""
-            )
-        )
-        substituted = chars.copy()
-        
+        chars = sorted(set(SUBSTITUTION_ALPHABET))
+
+        # Собственный генератор не затрагивает глобальное состояние np.random
         seed = self._generate_seed_from_magic_square(magic_square)
-        np.random.seed(seed)
-        np.random.shuffle(substituted)
-        
+        substituted = np.random.default_rng(seed).permutation(chars).tolist()
+
         return dict(zip(chars, substituted))
 
+    def get_substitution_tables(self, magic_square: np.ndarray) -> Tuple[dict, dict]:
+        """
+        Скомпилированные таблицы str.translate для прямой и обратной подстановки
+
+        Таблицы кэшируются по отпечатку квадрата, при переполнении кэша
+        вытесняется давно не использованная запись.
+
+        Returns:
+            tuple: (forward_table: dict, reverse_table: dict)
+        """
+        square = np.asarray(magic_square)
+        fingerprint = (square.shape, square.astype(np.int64).tobytes())
+
+        tables = self._substitution_cache.get(fingerprint)
+        if tables is not None:
+            self._substitution_cache.move_to_end(fingerprint)
+            return tables
+
+        sub_table = self.create_substitution_table_from_magic_square(square)
+        tables = (
+            str.maketrans(sub_table),
+            str.maketrans({v: k for k, v in sub_table.items()}),
+        )
+        self._substitution_cache[fingerprint] = tables
+        if len(self._substitution_cache) > self.substitution_cache_size:
+            self._substitution_cache.popitem(last=False)
+        return tables
+
     def _generate_seed_from_magic_square(self, magic_square: np.ndarray) -> int:
         """
         Генерация seed на основе магического квадрата без внешних зависимостей.
@@ -307,17 +522,11 @@ class MagicSquareCipher:
         # 1. Сумма всех элементов квадрата
         total_sum = np.sum(magic_square)
         
-        # 2. Произведение элементов главной диагонали
-        main_diag = np.diag(magic_square)
-        main_diag_product = 1
-        for num in main_diag:
-            main_diag_product = (main_diag_product * (num if num != 0 else 1)) & 0xFFFFFFFF
+        # 2. Произведение элементов главной диагонали (нули заменяются единицами)
+        main_diag_product = self._product_mod_2_32(np.diag(magic_square))
         
         # 3. Произведение элементов побочной диагонали  
-        anti_diag = np.diag(np.fliplr(magic_square))
-        anti_diag_product = 1
-        for num in anti_diag:
-            anti_diag_product = (anti_diag_product * (num if num != 0 else 1)) & 0xFFFFFFFF
+        anti_diag_product = self._product_mod_2_32(np.diag(np.fliplr(magic_square)))
         
         # 4. Сумма угловых элементов
         corners_sum = (
@@ -339,12 +548,11 @@ class MagicSquareCipher:
             )
         
         # 6. Характеристика распределения чисел - сумма модулей разностей соседних элементов
-        neighbor_diff_sum = 0
-        for i in range(n):
-            for j in range(n-1):
-                neighbor_diff_sum += abs(magic_square[i, j] - magic_square[i, j+1])
-            if i < n-1:
-                neighbor_diff_sum += abs(magic_square[i, 0] - magic_square[i+1, 0])
+        # (по строкам и по первому столбцу)
+        neighbor_diff_sum = (
+            np.abs(np.diff(magic_square, axis=1)).sum() +
+            np.abs(np.diff(magic_square[:, 0])).sum()
+        )
         
         # 7. Комбинируем все характеристики через битовые операции
         seed = total_sum
@@ -370,139 +578,598 @@ class MagicSquareCipher:
         
         return seed & 0xFFFFFFFF
 
-    def apply_substitution(self, text: str, magic_square) -> str:
-        """Применение подстановки к тексту"""
-        sub_table = self.create_substitution_table_from_magic_square(magic_square)
-        result = []
+    @staticmethod
+    def _product_mod_2_32(values: np.ndarray) -> np.int64:
+        """
+        Произведение values по модулю 2**32, нули заменяются единицами
 
-        for char in text:
-            if char in sub_table:
-                result.append(sub_table[char])
-            else:
-                result.append(char)
+        Умножение в uint64 идет по модулю 2**64, поэтому младшие 32 бита
+        совпадают с последовательным умножением с маской на каждом шаге.
+        """
+        factors = np.where(values != 0, values, 1).astype(np.int64).astype(np.uint64)
+        return np.int64(np.prod(factors) & np.uint64(0xFFFFFFFF))
 
-        return "".join(result)
+    def apply_substitution(self, text: str, magic_square) -> str:
+        """Применение подстановки к тексту"""
+        forward_table, _ = self.get_substitution_tables(magic_square)
+        with self._stage("substitution", len(text) * TEXT_CODE_BYTES):
+            return text.translate(forward_table)
 
     def reverse_substitution(self, text: str, magic_square) -> str:
         """Обратная подстановка"""
-        sub_table = self.create_substitution_table_from_magic_square(magic_square)
-        reverse_table = {v: k for k, v in sub_table.items()}
-        result = []
-
-        for char in text:
-            if char in reverse_table:
-                result.append(reverse_table[char])
-            else:
-                result.append(char)
-
-        return "".join(result)
+        _, reverse_table = self.get_substitution_tables(magic_square)
+        with self._stage("substitution", len(text) * TEXT_CODE_BYTES):
+            return text.translate(reverse_table)
 
     def encrypt(self, plaintext: str, n: int, use_sub: bool, 
                 method: str = "random", seed: Optional[int] = None,
                 magic_sum: Optional[int] = None) -> str:
         """Шифрование текста любой длины с расширенной генерацией квадрата"""
-        magic_square = self.generate_magic_square(n, method, seed, magic_sum)
-        return self.encrypt_with_square(plaintext, magic_square, use_sub)
+        schedule = self.get_key_schedule(n, method, seed, magic_sum)
+        substitution = self._schedule_substitution(schedule)[0] if use_sub else None
+        return self._encrypt_text(plaintext, schedule["forward"], substitution)
 
     def decrypt(self, ciphertext: str, n: int, use_sub: bool,
                 method: str = "random", seed: Optional[int] = None,
                 magic_sum: Optional[int] = None) -> str:
         """Расшифрование текста любой длины с расширенной генерацией квадрата"""
-        magic_square = self.generate_magic_square(n, method, seed, magic_sum)
-        return self.decrypt_with_square(ciphertext, magic_square, use_sub)
+        schedule = self.get_key_schedule(n, method, seed, magic_sum)
+        substitution = self._schedule_substitution(schedule)[1] if use_sub else None
+        return self._decrypt_text(ciphertext, schedule["inverse"], substitution)
+
+    def get_key_schedule(self, n: int, method: str = "random",
+                         seed: Optional[int] = None,
+                         magic_sum: Optional[int] = None) -> dict:
+        """
+        Расписание ключа: проверенный квадрат и производные от него таблицы
+
+        Расписания кэшируются по (n, method, seed, magic_sum) с вытеснением
+        давно не использованных. Метод "random" без seed каждый раз дает
+        новый квадрат, поэтому такие ключи не кэшируются.
+
+        Таблицы подстановки строятся только при первом шифровании с
+        подстановкой (_schedule_substitution): без нее они не нужны, а для
+        больших n их построение дороже перестановки.
+
+        Returns:
+            dict: square, forward, inverse, substitution (прямая и обратная
+            таблицы или None, пока они не построены)
+        """
+        key = (n, method, seed, magic_sum)
+        cacheable = seed is not None or method != "random"
+
+        if cacheable and key in self._key_schedule_cache:
+            self._key_schedule_cache.move_to_end(key)
+            self.key_schedule_stats["hits"] += 1
+            return self._key_schedule_cache[key]
+
+        square = self.generate_magic_square(n, method, seed, magic_sum)
+        forward, inverse = self.build_permutation(square)
+        schedule = {
+            "square": square,
+            "forward": forward,
+            "inverse": inverse,
+            "substitution": None,
+        }
+        if not cacheable:
+            return schedule
+
+        self.key_schedule_stats["misses"] += 1
+        self._key_schedule_cache[key] = schedule
+        if len(self._key_schedule_cache) > self.key_schedule_cache_size:
+            self._key_schedule_cache.popitem(last=False)
+            self.key_schedule_stats["evictions"] += 1
+        return schedule
+
+    def _schedule_substitution(self, schedule: dict) -> Tuple[dict, dict]:
+        """Таблицы подстановки расписания ключа, построенные при первом обращении"""
+        if schedule["substitution"] is None:
+            schedule["substitution"] = self.get_substitution_tables(schedule["square"])
+        return schedule["substitution"]
+
+    def get_key_schedule_stats(self) -> dict:
+        """Статистика кэша расписаний ключей"""
+        return {**self.key_schedule_stats, "size": len(self._key_schedule_cache)}
 
     def encrypt_with_square(self, plaintext: str, magic_square: np.ndarray, use_sub: bool) -> str:
         """Шифрование текста любой длины с использованием заданного квадрата"""
-        n = magic_square.shape[0]
-        block_size = n * n
-        
-        # Применение подстановки ко всему тексту
-        if use_sub:
-            plaintext = self.apply_substitution(plaintext, magic_square)
-        
-        # Разбиваем текст на блоки
-        encrypted_blocks = []
-        for i in range(0, len(plaintext), block_size):
-            block = plaintext[i:i + block_size]
-            
-            # Дополнение последнего блока если нужно
-            if len(block) < block_size:
-                block += self.padding_char * (block_size - len(block))
-            
-            # Шифруем блок
-            encrypted_block = self._encrypt_single_block(block, magic_square)
-            encrypted_blocks.append(encrypted_block)
-        
-        return "".join(encrypted_blocks)
+        forward, _ = self.build_permutation(magic_square)
+        substitution = self.get_substitution_tables(magic_square)[0] if use_sub else None
+        return self._encrypt_text(plaintext, forward, substitution)
 
     def decrypt_with_square(self, ciphertext: str, magic_square: np.ndarray, use_sub: bool) -> str:
         """Расшифрование текста любой длины с использованием заданного квадрата"""
-        n = magic_square.shape[0]
-        block_size = n * n
-        
-        # Проверяем, что длина шифротекста кратна размеру блока
-        if len(ciphertext) % block_size != 0:
-            # Если нет, дополняем до кратности
-            padding_needed = block_size - (len(ciphertext) % block_size)
-            ciphertext += self.padding_char * padding_needed
-        
-        # Разбиваем шифротекст на блоки
-        decrypted_blocks = []
-        for i in range(0, len(ciphertext), block_size):
-            block = ciphertext[i:i + block_size]
-            
-            # Расшифровываем блок
-            decrypted_block = self._decrypt_single_block(block, magic_square)
-            decrypted_blocks.append(decrypted_block)
-        
-        # Объединяем и удаляем дополнение
-        result = "".join(decrypted_blocks)
-        result = result.rstrip(self.padding_char)
-        
+        _, inverse = self.build_permutation(magic_square)
+        substitution = self.get_substitution_tables(magic_square)[1] if use_sub else None
+        return self._decrypt_text(ciphertext, inverse, substitution)
+
+    def _encrypt_text(self, plaintext: str, forward: np.ndarray,
+                      substitution: Optional[dict]) -> str:
+        """Шифрование текста по готовой перестановке и таблице подстановки"""
+        # Применение подстановки ко всему тексту
+        if substitution is not None:
+            with self._stage("substitution", len(plaintext) * TEXT_CODE_BYTES):
+                plaintext = plaintext.translate(substitution)
+
+        if not plaintext:
+            return ""
+
+        codes = self._text_to_codes(plaintext, len(forward))
+        return self._codes_to_text(self._permute_blocks(codes, forward))
+
+    def _decrypt_text(self, ciphertext: str, inverse: np.ndarray,
+                      substitution: Optional[dict]) -> str:
+        """Расшифрование текста по готовой перестановке и таблице подстановки"""
+        if not ciphertext:
+            return ""
+
+        # Шифротекст дополняется до кратности размеру блока
+        codes = self._text_to_codes(ciphertext, len(inverse))
+        result = self._codes_to_text(self._permute_blocks(codes, inverse))
+        with self._stage("padding", len(inverse) * TEXT_CODE_BYTES):
+            result = result.rstrip(self.padding_char)
+
         # Обратная подстановка
-        if use_sub:
-            result = self.reverse_substitution(result, magic_square)
-        
+        if substitution is not None:
+            with self._stage("substitution", len(result) * TEXT_CODE_BYTES):
+                result = result.translate(substitution)
+
         return result
 
+    def encrypt_cascade(self, plaintext: str, magic_squares: List[np.ndarray], use_sub: bool) -> str:
+        """
+        Каскадное шифрование последовательностью квадратов (возможно разных размеров)
+
+        Результат совпадает с последовательным применением encrypt_with_square
+        к тексту, дополненному до кратности общему блоку, но все перестановки
+        выполняются одной выборкой по индексам за один проход.
+        """
+        forward, _ = self.build_cascade_permutation(magic_squares)
+        substitution = self._cascade_substitution_tables(magic_squares)[0] if use_sub else None
+        return self._encrypt_text(plaintext, forward, substitution)
+
+    def decrypt_cascade(self, ciphertext: str, magic_squares: List[np.ndarray], use_sub: bool) -> str:
+        """Расшифрование текста, зашифрованного encrypt_cascade с теми же квадратами"""
+        _, inverse = self.build_cascade_permutation(magic_squares)
+        substitution = self._cascade_substitution_tables(magic_squares)[1] if use_sub else None
+        return self._decrypt_text(ciphertext, inverse, substitution)
+
+    def build_cascade_permutation(self, magic_squares: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Композиция перестановок нескольких квадратов на общем блоке
+
+        Общий блок - наименьшее общее кратное размеров блоков n_i², в нем
+        перестановка каждого квадрата повторяется для всех его подблоков.
+
+        Returns:
+            tuple: (forward: np.ndarray, inverse: np.ndarray)
+        """
+        if not magic_squares:
+            raise ValueError("Для каскада нужен хотя бы один квадрат")
+
+        block_size = math.lcm(*(square.shape[0] ** 2 for square in magic_squares))
+        forward = np.arange(block_size)
+        for square in magic_squares:
+            step, _ = self.build_permutation(square)
+            offsets = np.arange(0, block_size, len(step))[:, np.newaxis]
+            forward = forward[(offsets + step).reshape(-1)]
+
+        inverse = np.empty_like(forward)
+        inverse[forward] = np.arange(block_size)
+        return forward, inverse
+
+    def _cascade_substitution_tables(self, magic_squares: List[np.ndarray]) -> Tuple[dict, dict]:
+        """Композиция подстановок всех квадратов каскада в одну пару таблиц"""
+        chars = sorted(set(SUBSTITUTION_ALPHABET))
+        substituted = "".join(chars)
+        for square in magic_squares:
+            substituted = substituted.translate(self.get_substitution_tables(square)[0])
+
+        mapping = dict(zip(chars, substituted))
+        return str.maketrans(mapping), str.maketrans({v: k for k, v in mapping.items()})
+
+    def encrypt_stream(self, source: IO[str], target: IO[str], magic_square: np.ndarray,
+                       use_sub: bool, chunk_blocks: int = 4096) -> int:
+        """
+        Потоковое шифрование из файлового объекта в файловый объект
+
+        Текст читается порциями по chunk_blocks блоков, поэтому расход памяти
+        не зависит от размера входа. Дополняется только последний блок потока.
+
+        Returns:
+            int: количество записанных символов шифротекста
+        """
+        forward, _ = self.build_permutation(magic_square)
+        block_size = len(forward)
+        chunk_size = block_size * chunk_blocks
+
+        written = 0
+        pending = ""
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            full = len(pending) - len(pending) % block_size
+            if full < chunk_size:
+                continue
+            written += self._encrypt_stream_chunk(pending[:full], target, magic_square, forward, use_sub)
+            pending = pending[full:]
+
+        if pending:
+            written += self._encrypt_stream_chunk(pending, target, magic_square, forward, use_sub)
+        return written
+
+    def decrypt_stream(self, source: IO[str], target: IO[str], magic_square: np.ndarray,
+                       use_sub: bool, chunk_blocks: int = 4096) -> int:
+        """
+        Потоковое расшифрование из файлового объекта в файловый объект
+
+        Символы дополнения в конце каждой порции придерживаются до следующей:
+        отбрасываются только те, что стоят в самом конце потока.
+
+        Returns:
+            int: количество записанных символов открытого текста
+        """
+        _, inverse = self.build_permutation(magic_square)
+        block_size = len(inverse)
+        chunk_size = block_size * chunk_blocks
+
+        written = 0
+        pending = ""
+        held_padding = ""
+        while True:
+            chunk = source.read(chunk_size)
+            at_end = not chunk
+            pending += chunk
+            full = len(pending) if at_end else len(pending) - len(pending) % block_size
+            if not at_end and full < chunk_size:
+                continue
+
+            if full:
+                codes = self._text_to_codes(pending[:full], block_size)
+                text = self._codes_to_text(self._permute_blocks(codes, inverse))
+                pending = pending[full:]
+
+                with self._stage("padding", block_size * TEXT_CODE_BYTES):
+                    body = text.rstrip(self.padding_char)
+                if body:
+                    if use_sub:
+                        body = self.reverse_substitution(body, magic_square)
+                    target.write(held_padding + body)
+                    written += len(held_padding) + len(body)
+                    held_padding = ""
+                held_padding += text[len(body):]
+
+            if at_end:
+                return written
+
+    def _encrypt_stream_chunk(self, text: str, target: IO[str], magic_square: np.ndarray,
+                              forward: np.ndarray, use_sub: bool) -> int:
+        """Шифрование одной порции потока и запись результата"""
+        if use_sub:
+            text = self.apply_substitution(text, magic_square)
+        encrypted = self._codes_to_text(
+            self._permute_blocks(self._text_to_codes(text, len(forward)), forward)
+        )
+        target.write(encrypted)
+        return len(encrypted)
+
+    def encrypt_bytes(self, data: Union[bytes, bytearray, memoryview], magic_square: np.ndarray,
+                      use_sub: bool = False, out: Optional[bytearray] = None) -> memoryview:
+        """
+        Шифрование двоичных данных без декодирования в текст
+
+        Вход не копируется: полные блоки читаются через np.frombuffer и
+        переставляются сразу в выходной буфер. Буфер out (если передан)
+        должен вмещать данные, дополненные до кратности n*n. Исходная длина
+        в результат не записывается: ее нужно сохранить и передать в
+        decrypt_bytes (encrypt_file хранит ее в трейлере).
+
+        Returns:
+            memoryview: зашифрованные данные в выходном буфере
+        """
+        forward, _ = self.build_permutation(magic_square)
+        source = np.frombuffer(data, dtype=np.uint8)
+        if use_sub:
+            lookup = self._byte_substitution_table(magic_square, reverse=False)
+            with self._stage("substitution", len(source)):
+                source = lookup[source]
+
+        target = self._permute_byte_blocks(source, forward, out)
+        return memoryview(target.data).cast("B")
+
+    def decrypt_bytes(self, data: Union[bytes, bytearray, memoryview], magic_square: np.ndarray,
+                      use_sub: bool = False, out: Optional[bytearray] = None,
+                      *, length: int) -> memoryview:
+        """
+        Расшифрование двоичных данных без декодирования в текст
+
+        Результат обрезается по исходной длине length. Отбрасывать байты
+        дополнения по значению, как для текста, нельзя: двоичные данные
+        сами могут оканчиваться таким байтом.
+
+        Returns:
+            memoryview: расшифрованные данные в выходном буфере
+        """
+        _, inverse = self.build_permutation(magic_square)
+        target = self._permute_byte_blocks(np.frombuffer(data, dtype=np.uint8), inverse, out)
+        if not 0 <= length <= len(target):
+            raise ValueError(f"Длина {length} вне диапазона 0..{len(target)}")
+        target = target[:length]
+
+        if use_sub:
+            lookup = self._byte_substitution_table(magic_square, reverse=True)
+            with self._stage("substitution", len(target)):
+                target[:] = lookup[target]
+        return memoryview(target.data).cast("B")
+
+    def encrypt_file(self, path: str, magic_square: np.ndarray, in_place: bool = True,
+                     out_path: Optional[str] = None, use_sub: bool = False,
+                     window_bytes: int = 16 * 1024 * 1024) -> int:
+        """
+        Шифрование файла через np.memmap окнами по window_bytes
+
+        Файл рассматривается как строки по n*n байт. Полные блоки
+        переставляются на месте (или пишутся в out_path), неполный хвост
+        дополняется до блока и вместе с исходной длиной файла и размером
+        блока записывается в небольшой трейлер в конце.
+
+        Returns:
+            int: размер зашифрованного файла в байтах
+        """
+        forward, _ = self.build_permutation(magic_square)
+        block_size = len(forward)
+        size = os.path.getsize(path)
+        full = size // block_size
+        target = self._prepare_file_target(path, in_place, out_path)
+
+        lookup = self._byte_substitution_table(magic_square, reverse=False) if use_sub else None
+        self._permute_file_blocks(path, target, full, forward, window_bytes, lookup, None)
+
+        with open(path, "rb") as source:
+            source.seek(full * block_size)
+            tail = source.read()
+        trailer = bytes(self.encrypt_bytes(tail, magic_square, use_sub)) if tail else b""
+        trailer += struct.pack(FILE_TRAILER_FORMAT, size, block_size) + FILE_TRAILER_MAGIC
+
+        with open(target, "r+b") as output:
+            output.seek(full * block_size)
+            output.write(trailer)
+            output.truncate()
+            return output.tell()
+
+    def decrypt_file(self, path: str, magic_square: np.ndarray, in_place: bool = True,
+                     out_path: Optional[str] = None, use_sub: bool = False,
+                     window_bytes: int = 16 * 1024 * 1024) -> int:
+        """
+        Расшифрование файла, зашифрованного encrypt_file
+
+        До изменения файла проверяются размер блока из трейлера и общий
+        размер файла: квадрат другого размера не испортит данные, а
+        вызовет ValueError.
+
+        Returns:
+            int: размер расшифрованного файла в байтах
+        """
+        _, inverse = self.build_permutation(magic_square)
+        block_size = len(inverse)
+        trailer_size = struct.calcsize(FILE_TRAILER_FORMAT) + len(FILE_TRAILER_MAGIC)
+
+        with open(path, "rb") as source:
+            source.seek(0, os.SEEK_END)
+            if source.tell() < trailer_size:
+                raise ValueError("Файл не содержит трейлера шифрования")
+            source.seek(-trailer_size, os.SEEK_END)
+            trailer = source.read()
+            if trailer[-len(FILE_TRAILER_MAGIC):] != FILE_TRAILER_MAGIC:
+                raise ValueError("Файл не содержит трейлера шифрования")
+            size, stored_block_size = struct.unpack(FILE_TRAILER_FORMAT, trailer[:-len(FILE_TRAILER_MAGIC)])
+
+            if stored_block_size != block_size:
+                raise ValueError(
+                    f"Файл зашифрован блоками по {stored_block_size} байт, "
+                    f"а квадрат задает блок {block_size} байт"
+                )
+            expected = -(-size // block_size) * block_size + trailer_size
+            if os.path.getsize(path) != expected:
+                raise ValueError("Размер файла не соответствует трейлеру шифрования")
+
+            full = size // block_size
+            tail_size = size - full * block_size
+            source.seek(full * block_size)
+            tail = source.read(block_size) if tail_size else b""
+
+        target = self._prepare_file_target(path, in_place, out_path)
+        lookup = self._byte_substitution_table(magic_square, reverse=True) if use_sub else None
+        self._permute_file_blocks(path, target, full, inverse, window_bytes, None, lookup)
+
+        with open(target, "r+b") as output:
+            output.seek(full * block_size)
+            if tail:
+                output.write(bytes(self.decrypt_bytes(tail, magic_square, use_sub, length=tail_size)))
+            output.truncate(size)
+        return size
+
+    def _prepare_file_target(self, path: str, in_place: bool, out_path: Optional[str]) -> str:
+        """Файл для записи результата: исходный или новый пустой"""
+        if in_place:
+            return path
+        if out_path is None:
+            raise ValueError("Для шифрования не на месте нужно указать out_path")
+        open(out_path, "wb").close()
+        return out_path
+
+    def _permute_file_blocks(self, path: str, target: str, full: int, index: np.ndarray,
+                             window_bytes: int, before: Optional[np.ndarray],
+                             after: Optional[np.ndarray]) -> None:
+        """Перестановка полных блоков файла окнами через np.memmap"""
+        if full == 0:
+            return
+
+        block_size = len(index)
+        window_blocks = max(1, window_bytes // block_size)
+        if target != path:
+            with open(target, "r+b") as output:
+                output.truncate(full * block_size)
+
+        source = np.memmap(path, dtype=np.uint8, mode="r" if target != path else "r+",
+                           shape=(full, block_size))
+        output = source if target == path else np.memmap(
+            target, dtype=np.uint8, mode="r+", shape=(full, block_size)
+        )
+
+        buffer = np.empty((min(window_blocks, full), block_size), dtype=np.uint8)
+        for start in range(0, full, window_blocks):
+            window = source[start:start + window_blocks]
+            permuted = buffer[:len(window)]
+            if before is not None:
+                with self._stage("substitution", window.nbytes):
+                    window = before[window]
+            self._permute_blocks(window, index, out=permuted)
+            if after is not None:
+                with self._stage("substitution", permuted.nbytes):
+                    permuted = after[permuted]
+            output[start:start + len(window)] = permuted
+
+        output.flush()
+        del source, output
+
+    def _permute_byte_blocks(self, source: np.ndarray, index: np.ndarray,
+                             out: Optional[bytearray]) -> np.ndarray:
+        """Перестановка блоков массива байтов в выходной буфер"""
+        block_size = len(index)
+        full = len(source) // block_size
+        padded = -(-len(source) // block_size) * block_size
+
+        if out is None:
+            out = bytearray(padded)
+        target = np.frombuffer(out, dtype=np.uint8)
+        if len(target) < padded:
+            raise ValueError(f"Выходной буфер должен вмещать {padded} байт, получено {len(target)}")
+        target = target[:padded]
+
+        blocks = target.reshape(-1, block_size)
+        self._permute_blocks(source[:full * block_size], index, out=blocks[:full])
+
+        if padded > full * block_size:
+            with self._stage("padding", block_size):
+                tail = np.full(block_size, ord(self.padding_char), dtype=np.uint8)
+                tail[:len(source) - full * block_size] = source[full * block_size:]
+                blocks[full] = tail[index]
+        return target
+
+    def _byte_substitution_table(self, magic_square: np.ndarray, reverse: bool) -> np.ndarray:
+        """Таблица подстановки по всем 256 значениям байта"""
+        table = self.get_substitution_tables(magic_square)[1 if reverse else 0]
+        lookup = np.arange(256, dtype=np.uint8)
+        lookup[list(table.keys())] = [ord(char) for char in table.values()]
+        return lookup
+
+    def build_permutation(self, magic_square: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Построение индексов перестановки по магическому квадрату
+
+        Символ с позиции k блока уходит на позицию magic_square.flat[k] - 1.
+        Шифрование и расшифрование сводятся к выборке по индексам:
+        block[forward] и block[inverse] соответственно.
+
+        Returns:
+            tuple: (forward: np.ndarray, inverse: np.ndarray)
+        """
+        n = magic_square.shape[0]
+        block_size = n * n
+        inverse = np.asarray(magic_square, dtype=np.int64).reshape(block_size) - 1
+
+        if not np.array_equal(np.sort(inverse), np.arange(block_size)):
+            raise ValueError(
+                f"Для шифрования квадрат должен содержать числа 1..{block_size} без повторов"
+            )
+
+        forward = np.empty(block_size, dtype=np.intp)
+        forward[inverse] = np.arange(block_size)
+        return forward, inverse.astype(np.intp)
+
+    def _permute_blocks(self, codes: np.ndarray, index: np.ndarray,
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Перестановка всех блоков массива кодов выборкой по индексам
+
+        Блоки независимы, поэтому большие массивы (от parallel_threshold байт)
+        делятся на диапазоны блоков и обрабатываются в пуле потоков:
+        np.take отпускает GIL. Результаты пишутся в общий выходной массив,
+        так что порядок блоков сохраняется.
+
+        Индексы уже проверены build_permutation, поэтому np.take вызывается
+        с mode="clip": в режиме "raise" NumPy пишет результат во временный
+        массив размером с out и только потом копирует его в out.
+        """
+        blocks = codes.reshape(-1, len(index))
+        if out is None:
+            out = np.empty_like(blocks)
+        out = out.reshape(blocks.shape)
+
+        with self._stage("permutation", blocks.nbytes):
+            ranges = self._parallel_block_ranges(blocks)
+            if len(ranges) == 1:
+                np.take(blocks, index, axis=1, out=out, mode="clip")
+            else:
+                with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                    list(pool.map(
+                        lambda bounds: np.take(
+                            blocks[bounds[0]:bounds[1]], index, axis=1,
+                            out=out[bounds[0]:bounds[1]], mode="clip",
+                        ),
+                        ranges,
+                    ))
+        return out.reshape(-1)
+
+    def _parallel_block_ranges(self, blocks: np.ndarray) -> List[Tuple[int, int]]:
+        """Разбиение блоков на диапазоны для параллельной обработки"""
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or blocks.nbytes < self.parallel_threshold:
+            return [(0, len(blocks))]
+
+        bounds = np.linspace(0, len(blocks), min(workers, len(blocks)) + 1).astype(int)
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def _text_to_codes(self, text: str, block_size: int) -> np.ndarray:
+        """Текст -> массив кодов символов, дополненный до кратности размеру блока"""
+        length = len(text)
+        padded = -(-length // block_size) * block_size
+        codes = np.empty(padded, dtype=np.uint32)
+        with self._stage("padding", (padded - length) * TEXT_CODE_BYTES):
+            codes[length:] = ord(self.padding_char)
+        with self._stage("conversion", length * TEXT_CODE_BYTES):
+            codes[:length] = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        return codes
+
+    def _codes_to_text(self, codes: np.ndarray) -> str:
+        """Массив кодов символов -> текст"""
+        with self._stage("conversion", len(codes) * TEXT_CODE_BYTES):
+            return codes.astype(np.uint32, copy=False).tobytes().decode("utf-32-le")
+
     def _encrypt_single_block(self, block: str, magic_square: np.ndarray) -> str:
         """Шифрование одного блока текста"""
         n = magic_square.shape[0]
-        
+
         # Проверяем, что блок правильного размера
         if len(block) != n * n:
             raise ValueError(f"Размер блока должен быть {n * n}, получен {len(block)}")
-        
-        # Размещение символов в матрице
-        text_matrix = np.array(list(block)).reshape(n, n)
-        
-        # Чтение по значениям магического квадрата
-        encrypted = [""] * (n * n)
-        for i in range(n):
-            for j in range(n):
-                position = magic_square[i, j] - 1
-                encrypted[position] = text_matrix[i, j]
-        
-        return "".join(encrypted)
+
+        forward, _ = self.build_permutation(magic_square)
+        return self._codes_to_text(self._permute_blocks(self._text_to_codes(block, n * n), forward))
 
     def _decrypt_single_block(self, block: str, magic_square: np.ndarray) -> str:
         """Расшифрование одного блока текста"""
         n = magic_square.shape[0]
-        
+
         # Проверяем, что блок правильного размера
         if len(block) != n * n:
             raise ValueError(f"Размер блока должен быть {n * n}, получен {len(block)}")
-        
-        # Размещение символов по значениям магического квадрата
-        decrypted_matrix = np.empty((n, n), dtype=str)
-        
-        for i in range(n):
-            for j in range(n):
-                position = magic_square[i, j] - 1
-                decrypted_matrix[i, j] = block[position]
-        
-        # Чтение по порядку
-        return "".join(decrypted_matrix.flatten())
+
+        _, inverse = self.build_permutation(magic_square)
+        return self._codes_to_text(self._permute_blocks(self._text_to_codes(block, n * n), inverse))
 
     def get_block_size(self, magic_square: np.ndarray) -> int:
         """Возвращает размер блока для заданного квадрата"""
@@ -510,16 +1177,68 @@ class MagicSquareCipher:
         return n * n
 
     def get_encryption_info(self, plaintext: str, magic_square: np.ndarray) -> dict:
-        """Возвращает информацию о процессе шифрования"""
+        """
+        Возвращает информацию о процессе шифрования
+
+        Если подключен профилировщик с методом report(), в ответ добавляется
+        время и объем данных по этапам (ключ "stages").
+        """
         n = magic_square.shape[0]
         block_size = n * n
         total_blocks = (len(plaintext) + block_size - 1) // block_size
         magic_sum = self.calculate_magic_sum(magic_square)
         
-        return {
+        info = {
             "square_size": n,
             "block_size": block_size,
             "total_blocks": total_blocks,
             "magic_sum": magic_sum,
             "padding_char": self.padding_char
-        }
\ No newline at end of file
+        }
+        if hasattr(self.profiler, "report"):
+            info["stages"] = self.profiler.report()
+        return info
+
+    @contextmanager
+    def _stage(self, name: str, size: int):
+        """Замер этапа для подключенного профилировщика"""
+        if self.profiler is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.profiler.record(name, time.perf_counter() - start, size)
+
+
+class StageProfiler:
+    """
+    Профилировщик этапов шифрования
+
+    Подключается через MagicSquareCipher.profiler; вместо него можно
+    передать любой объект с методом record(stage, seconds, size).
+    Размер - объем обработанных данных в байтах: для двоичных данных и
+    файлов - сами байты, для текста - его внутреннее представление
+    (TEXT_CODE_BYTES на символ). Этапы: generation, validation,
+    substitution, conversion (текст <-> коды символов), padding,
+    permutation.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def record(self, stage: str, seconds: float, size: int) -> None:
+        """Учет одного замера этапа"""
+        totals = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "size": 0})
+        totals["calls"] += 1
+        totals["seconds"] += seconds
+        totals["size"] += size
+
+    def report(self) -> dict:
+        """Накопленные замеры по этапам"""
+        return {stage: dict(totals) for stage, totals in self.stages.items()}
+
+    def reset(self) -> None:
+        """Сброс замеров"""
+        self.stages.clear()
\ No newline at end of file
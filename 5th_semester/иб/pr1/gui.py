@@ -1,3 +1,4 @@
+import analytics
 from cipher import MagicSquareCipher
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
@@ -320,30 +321,15 @@ class CipherGUI:
         self.analysis_results.insert(tk.END, "\n3. СРАВНИТЕЛЬНЫЙ АНАЛИЗ\n")
         self.analysis_results.insert(tk.END, "-" * 40 + "\n")
 
-        # Энтропия
-        import math
-        from collections import Counter
-
-        def calculate_entropy(text):
-            if not text:
-                return 0
-            counter = Counter(text)
-            length = len(text)
-            entropy = 0
-            for count in counter.values():
-                probability = count / length
-                if probability > 0:
-                    entropy -= probability * math.log2(probability)
-            return entropy
-
         size = 5
         plaintext = test_text[: size * size]
         encrypted_basic = self.cipher.encrypt(plaintext, size)
         encrypted_mod = self.cipher.encrypt(plaintext, size, "SecretKey")
 
-        entropy_plain = calculate_entropy(plaintext)
-        entropy_basic = calculate_entropy(encrypted_basic)
-        entropy_mod = calculate_entropy(encrypted_mod)
+        # Энтропия
+        entropy_plain = analytics.shannon_entropy(plaintext)
+        entropy_basic = analytics.shannon_entropy(encrypted_basic)
+        entropy_mod = analytics.shannon_entropy(encrypted_mod)
 
         self.analysis_results.insert(
             tk.END, f"Энтропия исходного текста:       {entropy_plain:.4f}\n"
@@ -403,16 +389,11 @@ class CipherGUI:
 
     def analysis_frequency_analysis(self, plaintext, ciphertext, label):
         """Частотный анализ"""
-        from collections import Counter
-
-        plain_freq = Counter(plaintext)
-        cipher_freq = Counter(ciphertext)
-
         self.analysis_results.insert(tk.END, f"\n{label}:\n")
 
         # Топ-5 частых символов
-        plain_top = plain_freq.most_common(5)
-        cipher_top = cipher_freq.most_common(5)
+        plain_top = analytics.top_symbols(plaintext, 5)
+        cipher_top = analytics.top_symbols(ciphertext, 5)
 
         self.analysis_results.insert(
             tk.END, f"Топ символов исходного текста: {plain_top}\n"
@@ -1,3 +1,4 @@
+import io
 import traceback
 from cipher import MagicSquareCipher
 import gi
@@ -5,15 +6,22 @@ import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, Gdk, GLib
 import numpy as np
-import threading
 import random
 
+# Ключ задач шифрования: новый запрос вытесняет незавершенный
+CIPHER_JOB = "cipher"
+
 
 class CipherGUI:
     """Графический интерфейс для шифровальщика на GTK"""
 
-    def __init__(self, cipher: MagicSquareCipher):
+    def __init__(self, cipher: MagicSquareCipher, executor):
+        """
+        cipher - шифратор; executor - исполнитель фоновых задач
+        (job_executor.JobExecutor с dispatch=GLib.idle_add)
+        """
         self.cipher = cipher
+        self.executor = executor
         self.setup_theme()
         self.create_ui()
 
@@ -47,7 +55,7 @@ class CipherGUI:
             title="Шифр на основе магических квадратов"
         )
         self.window.set_default_size(1000, 800)
-        self.window.connect("destroy", Gtk.main_quit)
+        self.window.connect("destroy", self.on_destroy)
 
         # Основной контейнер
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
@@ -335,6 +343,16 @@ class CipherGUI:
         self.clear_btn.connect("clicked", self.on_clear_clicked)
         button_box.pack_start(self.clear_btn, False, False, 0)
 
+        self.cancel_btn = Gtk.Button(label="Отмена")
+        self.cancel_btn.connect("clicked", self.on_cancel_clicked)
+        self.cancel_btn.set_sensitive(False)
+        button_box.pack_start(self.cancel_btn, False, False, 0)
+
+        # Прогресс фоновой задачи
+        self.progress_bar = Gtk.ProgressBar()
+        self.progress_bar.set_show_text(True)
+        encrypt_box.pack_start(self.progress_bar, False, False, 0)
+
         # Информационная панель
         info_frame = Gtk.Frame(label="Информация")
         info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
@@ -635,51 +653,100 @@ class CipherGUI:
             )
             return
 
-        thread = threading.Thread(target=self._encrypt_thread, args=(plaintext,))
-        thread.daemon = True
-        thread.start()
+        self._start_cipher_job(self._encrypt_job, plaintext, "Шифрование...")
 
-    def _encrypt_thread(self, plaintext):
-        """Поток для шифрования"""
-        try:
-            use_sub = self.use_substitution.get_active()
+    def _collect_cipher_params(self) -> dict:
+        """
+        Параметры шифрования из виджетов (читаются в главном потоке)
 
-            if self.is_custom_square:
-                # Используем пользовательский квадрат
-                encrypted = self.cipher.encrypt_with_square(
-                    plaintext, self.current_square, use_sub
-                )
-            else:
-                # Используем параметры генерации
-                n = self.current_n
-                method = self.method_combo.get_active_text()
-                seed_text = self.seed_entry.get_text().strip()
-                seed = int(seed_text) if seed_text else None
+        Raises:
+            ValueError: зерно задано, но не является целым числом
+        """
+        params = {"use_sub": self.use_substitution.get_active(), "square": None}
+        if self.is_custom_square:
+            # Используем пользовательский квадрат
+            params["square"] = self.current_square
+            return params
 
-                magic_sum = None
-                if method in ["arithmetic", "geometric"]:
-                    magic_sum = int(self.magic_sum_spin.get_value())
+        # Используем параметры генерации
+        method = self.method_combo.get_active_text()
+        seed_text = self.seed_entry.get_text().strip()
+        try:
+            seed = int(seed_text) if seed_text else None
+        except ValueError:
+            raise ValueError(f"Зерно должно быть целым числом: {seed_text!r}") from None
+        magic_sum = None
+        if method in ["arithmetic", "geometric"]:
+            magic_sum = int(self.magic_sum_spin.get_value())
+        params.update(
+            n=self.current_n,
+            method=method,
+            seed=seed,
+            magic_sum=magic_sum,
+        )
+        return params
+
+    def _resolve_square(self, params: dict) -> np.ndarray:
+        """Квадрат для задачи: пользовательский или из расписания ключа"""
+        if params["square"] is not None:
+            return params["square"]
+        schedule = self.cipher.get_key_schedule(
+            params["n"], params["method"], params["seed"], params["magic_sum"]
+        )
+        return schedule["square"]
 
-                encrypted = self.cipher.encrypt(
-                    plaintext, n, use_sub, method, seed, magic_sum
-                )
+    def _start_cipher_job(self, func, text, status_message):
+        """Запуск задачи шифрования в общем исполнителе"""
+        # Параметры проверяются до перевода интерфейса в состояние "занят"
+        try:
+            params = self._collect_cipher_params()
+        except ValueError as error:
+            self.show_message("Ошибка", str(error), Gtk.MessageType.ERROR)
+            return
 
-            GLib.idle_add(
-                self._update_output,
-                encrypted,
-                f"Текст зашифрован. Длина: {len(encrypted)} символов",
-            )
+        self.progress_bar.set_fraction(0.0)
+        self.progress_bar.set_text(status_message)
+        self.cancel_btn.set_sensitive(True)
+        self.status_bar.push(self.status_context_id, status_message)
+        self.executor.submit(
+            CIPHER_JOB, func, text, params,
+            on_done=lambda result: self._update_output(*result),
+            on_error=self._on_cipher_error,
+            on_progress=self._on_cipher_progress,
+        )
 
-        except Exception as e:
-            error_msg = f"Ошибка при шифровании: {str(e)}"
-            print(error_msg)
-            print(traceback.format_exc())
-            GLib.idle_add(
-                self.show_message,
-                "Ошибка",
-                error_msg,
-                Gtk.MessageType.ERROR,
-            )
+    def _encrypt_job(self, job, plaintext, params):
+        """Фоновое шифрование порциями с прогрессом"""
+        square = self._resolve_square(params)
+        target = io.StringIO()
+        self.cipher.encrypt_stream(job.reader(plaintext), target, square, params["use_sub"])
+        encrypted = target.getvalue()
+        return encrypted, f"Текст зашифрован. Длина: {len(encrypted)} символов"
+
+    def _on_cipher_progress(self, fraction):
+        """Обновление индикатора прогресса"""
+        self.progress_bar.set_fraction(fraction)
+        self.progress_bar.set_text(f"{fraction:.0%}")
+
+    def _on_cipher_error(self, error):
+        """Ошибка фоновой задачи шифрования"""
+        error_msg = f"Ошибка при обработке текста: {str(error)}"
+        print(error_msg)
+        print("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+        self._reset_progress("Ошибка")
+        self.show_message("Ошибка", error_msg, Gtk.MessageType.ERROR)
+
+    def _reset_progress(self, text=""):
+        """Сброс индикатора после завершения или отмены задачи"""
+        self.cancel_btn.set_sensitive(False)
+        self.progress_bar.set_fraction(0.0)
+        self.progress_bar.set_text(text)
+
+    def on_cancel_clicked(self, widget):
+        """Обработчик кнопки отмены"""
+        if self.executor.cancel(CIPHER_JOB):
+            self._reset_progress("Отменено")
+            self.status_bar.push(self.status_context_id, "Операция отменена")
 
     def on_decrypt_clicked(self, widget):
         """Обработчик кнопки расшифрования"""
@@ -698,55 +765,20 @@ class CipherGUI:
             )
             return
 
-        thread = threading.Thread(target=self._decrypt_thread, args=(ciphertext,))
-        thread.daemon = True
-        thread.start()
-
-    def _decrypt_thread(self, ciphertext):
-        """Поток для расшифрования"""
-        try:
-            use_sub = self.use_substitution.get_active()
-
-            if self.is_custom_square:
-                # Используем пользовательский квадрат
-                decrypted = self.cipher.decrypt_with_square(
-                    ciphertext, self.current_square, use_sub
-                )
-            else:
-                # Используем параметры генерации
-                n = self.current_n
-                method = self.method_combo.get_active_text()
-                seed_text = self.seed_entry.get_text().strip()
-                seed = int(seed_text) if seed_text else None
-
-                magic_sum = None
-                if method in ["arithmetic", "geometric"]:
-                    magic_sum = int(self.magic_sum_spin.get_value())
-
-                decrypted = self.cipher.decrypt(
-                    ciphertext, n, use_sub, method, seed, magic_sum
-                )
-
-            GLib.idle_add(
-                self._update_output,
-                decrypted,
-                f"Текст расшифрован. Длина: {len(decrypted)} символов",
-            )
+        self._start_cipher_job(self._decrypt_job, ciphertext, "Расшифрование...")
 
-        except Exception as e:
-            error_msg = f"Ошибка при расшифровании: {str(e)}"
-            print(error_msg)
-            print(traceback.format_exc())
-            GLib.idle_add(
-                self.show_message,
-                "Ошибка",
-                error_msg,
-                Gtk.MessageType.ERROR,
-            )
+    def _decrypt_job(self, job, ciphertext, params):
+        """Фоновое расшифрование порциями с прогрессом"""
+        square = self._resolve_square(params)
+        target = io.StringIO()
+        self.cipher.decrypt_stream(job.reader(ciphertext), target, square, params["use_sub"])
+        decrypted = target.getvalue()
+        return decrypted, f"Текст расшифрован. Длина: {len(decrypted)} символов"
 
     def _update_output(self, text, info_message):
         """Обновить вывод и информацию"""
         self.set_text_to_buffer(self.output_buffer, text)
+        self._reset_progress("Готово")
         self.info_label.set_text(info_message)
         self.status_bar.push(self.status_context_id, info_message)
 
@@ -757,6 +789,11 @@ class CipherGUI:
         self.info_label.set_text("Поля очищены")
         self.status_bar.push(self.status_context_id, "Поля очищены")
 
+    def on_destroy(self, widget):
+        """Остановка фоновых задач при закрытии окна"""
+        self.executor.shutdown()
+        Gtk.main_quit()
+
     def run(self):
         """Запуск приложения"""
         # Генерируем квадрат по умолчанию при запуске
@@ -0,0 +1,232 @@
+import argparse
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from cipher import dihedral_index_maps
+
+# Заголовок файла ключевого пространства: метка и размер квадрата
+KEYSPACE_MAGIC = b"MSQK"
+KEYSPACE_HEADER_SIZE = 8
+
+# Полный перебор реален только для малых квадратов (для n = 5 их ~2.75·10⁸)
+MAX_KEYSPACE_N = 4
+
+# Известное число магических квадратов n x n с числами 1..n²
+KEYSPACE_SIZES = {1: 1, 2: 0, 3: 8, 4: 7040}
+
+
+def default_cache_dir() -> str:
+    """Каталог кэша для файлов ключевого пространства ($XDG_CACHE_HOME или ~/.cache)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "magic-square-cipher")
+
+
+def enumerate_magic_squares(n: int) -> np.ndarray:
+    """
+    Перечисление всех магических квадратов n x n с числами 1..n²
+
+    Поиск с возвратом заполняет клетки в порядке, при котором линии
+    (строки, столбцы, диагонали) замыкаются как можно раньше: последняя
+    клетка линии не перебирается, а вычисляется из магической суммы.
+    Частичные суммы отсекаются по границам достижимых значений. Перебираются
+    только канонические квадраты (левый верхний угол - минимальный из углов,
+    [0, 1] < [1, 0]), остальные получаются восемью симметриями.
+
+    Returns:
+        np.ndarray: массив uint8 формы (count, n, n), упорядоченный лексикографически
+    """
+    if not 1 <= n <= MAX_KEYSPACE_N:
+        raise ValueError(f"Перечисление поддерживается для n от 1 до {MAX_KEYSPACE_N}")
+
+    cells = n * n
+    magic_sum = n * (cells + 1) // 2
+
+    # Порядок обхода: первая строка, первый столбец, диагонали, остальное
+    order = [(0, j) for j in range(n)] + [(i, 0) for i in range(1, n)]
+    tail = [(i, n - 1 - i) for i in range(n)] + [(i, i) for i in range(n)]
+    tail += [(i, j) for i in range(n) for j in range(n)]
+    for cell in tail:
+        if cell not in order:
+            order.append(cell)
+    step_of = {cell: step for step, cell in enumerate(order)}
+
+    lines = [[(i, j) for j in range(n)] for i in range(n)]
+    lines += [[(i, j) for i in range(n)] for j in range(n)]
+    lines += [[(i, i) for i in range(n)], [(i, n - 1 - i) for i in range(n)]]
+
+    # Для каждого шага: линии, которые он замыкает, и линии, которые он продолжает
+    closing = [[] for _ in order]
+    partial = [[] for _ in order]
+    for line in lines:
+        steps = sorted(step_of[cell] for cell in line)
+        closing[steps[-1]].append(steps[:-1])
+        for k, step in enumerate(steps[:-1]):
+            partial[step].append((steps[:k], len(steps) - k - 1))
+
+    # Канонический представитель класса симметрий
+    greater_than = [[] for _ in order]
+    if n > 1:
+        corner = step_of[(0, 0)]
+        for cell in [(0, n - 1), (n - 1, 0), (n - 1, n - 1)]:
+            greater_than[step_of[cell]].append(corner)
+        greater_than[step_of[(1, 0)]].append(step_of[(0, 1)])
+
+    values = [0] * cells
+    found = []
+
+    def place(step: int, value: int, used: int) -> None:
+        if any(value <= values[other] for other in greater_than[step]):
+            return
+        values[step] = value
+        search(step + 1, used | 1 << value)
+
+    def search(step: int, used: int) -> None:
+        if step == cells:
+            found.append(tuple(values))
+            return
+
+        if closing[step]:
+            value = magic_sum - sum(values[k] for k in closing[step][0])
+            if not 1 <= value <= cells or used >> value & 1:
+                return
+            if any(sum(values[k] for k in line) + value != magic_sum for line in closing[step][1:]):
+                return
+            place(step, value, used)
+            return
+
+        bounds = [(sum(values[k] for k in before), rest) for before, rest in partial[step]]
+        for value in range(1, cells + 1):
+            if used >> value & 1:
+                continue
+            if any(
+                total + value + rest * (rest + 1) // 2 > magic_sum
+                or total + value + rest * (2 * cells - rest + 1) // 2 < magic_sum
+                for total, rest in bounds
+            ):
+                continue
+            place(step, value, used)
+
+    search(0, 0)
+
+    canonical = np.zeros((len(found), n, n), dtype=np.uint8)
+    rows, cols = zip(*order)
+    canonical[:, rows, cols] = np.array(found, dtype=np.uint8).reshape(len(found), cells)
+
+    rows, cols = dihedral_index_maps(n)
+    squares = canonical[:, rows, cols].reshape(-1, cells)
+    return np.unique(squares, axis=0).reshape(-1, n, n)
+
+
+def build_keyspace(path: str, n: int = 4) -> int:
+    """
+    Запись всех магических квадратов n x n в компактный двоичный файл
+
+    Формат: 8 байт заголовка (метка, n, три нулевых байта), затем квадраты
+    подряд по n² байт uint8. Файл пишется во временный файл рядом с path и
+    переносится на место через os.replace, поэтому прерванная запись не
+    оставляет под именем path обрезанный файл.
+
+    Returns:
+        int: количество записанных квадратов
+    """
+    squares = enumerate_magic_squares(n)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as output:
+            output.write(KEYSPACE_MAGIC + bytes([n, 0, 0, 0]))
+            output.write(squares.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return len(squares)
+
+
+class MagicSquareKeyspace:
+    """
+    Ключевое пространство магических квадратов, отображенное в память из файла
+
+    Файл с размером данных не кратным n² или с числом квадратов, отличным
+    от KEYSPACE_SIZES[n], отвергается (ValueError): это обрезанный или
+    поврежденный файл, а не полное ключевое пространство.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as source:
+            header = source.read(KEYSPACE_HEADER_SIZE)
+        if len(header) != KEYSPACE_HEADER_SIZE or header[:4] != KEYSPACE_MAGIC:
+            raise ValueError(f"Файл {path} не является файлом ключевого пространства")
+
+        self.path = path
+        self.n = header[4]
+        if self.n not in KEYSPACE_SIZES:
+            raise ValueError(f"Файл {path}: неподдерживаемый размер квадрата {self.n}")
+        count, remainder = divmod(os.path.getsize(path) - KEYSPACE_HEADER_SIZE, self.n * self.n)
+        if remainder or count != KEYSPACE_SIZES[self.n]:
+            raise ValueError(
+                f"Файл {path} поврежден: ожидалось {KEYSPACE_SIZES[self.n]} квадратов "
+                f"{self.n}x{self.n}, данных на {count} (остаток {remainder} байт)"
+            )
+        self.squares = np.memmap(
+            path, dtype=np.uint8, mode="r", offset=KEYSPACE_HEADER_SIZE,
+            shape=(count, self.n, self.n),
+        )
+
+    def __len__(self) -> int:
+        return len(self.squares)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Квадрат с номером index, пригодный для MagicSquareCipher"""
+        return self.squares[index].astype(int)
+
+    def index_of(self, square: np.ndarray) -> int:
+        """Номер квадрата в ключевом пространстве"""
+        matches = np.flatnonzero((self.squares == np.asarray(square)).all(axis=(1, 2)))
+        if not len(matches):
+            raise ValueError("Квадрат не найден в ключевом пространстве")
+        return int(matches[0])
+
+
+def load_keyspace(n: int = 4, path: Optional[str] = None) -> MagicSquareKeyspace:
+    """
+    Загрузка ключевого пространства; при первом обращении файл строится
+
+    По умолчанию файл keyspace_<n>.bin хранится в каталоге кэша
+    пользователя, а не рядом с исходным кодом; поврежденный файл кэша
+    строится заново. Для явно заданного path ошибка проверки файла
+    передается вызывающему.
+    """
+    cached = path is None
+    if cached:
+        cache_dir = default_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"keyspace_{n}.bin")
+    if not os.path.exists(path):
+        build_keyspace(path, n)
+    try:
+        return MagicSquareKeyspace(path)
+    except ValueError:
+        if not cached:
+            raise
+    build_keyspace(path, n)
+    return MagicSquareKeyspace(path)
+
+
+def main():
+    """Построение файла ключевого пространства из командной строки"""
+    parser = argparse.ArgumentParser(description="Перечисление всех магических квадратов n x n")
+    parser.add_argument("--n", type=int, default=4, help="размер квадрата (не больше 4)")
+    parser.add_argument("--output", help="путь к файлу (по умолчанию keyspace_<n>.bin)")
+    args = parser.parse_args()
+
+    output = args.output or f"keyspace_{args.n}.bin"
+    count = build_keyspace(output, args.n)
+    print(f"Записано квадратов {args.n}x{args.n}: {count} -> {output}")
+
+
+if __name__ == "__main__":
+    main()
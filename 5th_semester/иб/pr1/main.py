@@ -1,13 +1,32 @@
+import importlib.util
+import os
 import tkinter as tk
 
 from cipher import MagicSquareCipher
 from gui_gtk import CipherGUI
+from gi.repository import GLib
+
+
+def load_job_executor():
+    """
+    Загрузка общего модуля job_executor.py из родительского каталога
+
+    Модуль загружается по пути к файлу, sys.path не изменяется.
+    """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "job_executor.py")
+    spec = importlib.util.spec_from_file_location("job_executor", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
 
 def main():
     """Главная функция"""
     # root = tk.Tk()
-    app = CipherGUI(cipher=MagicSquareCipher())
+    job_executor = load_job_executor()
+    # Один рабочий поток: кэши шифра не рассчитаны на параллельный доступ
+    executor = job_executor.JobExecutor(workers=1, dispatch=GLib.idle_add)
+    app = CipherGUI(cipher=MagicSquareCipher(), executor=executor)
     app.run()
     # root.mainloop()
 
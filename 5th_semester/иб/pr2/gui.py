@@ -1,22 +1,30 @@
 import json
 import gi
-from rsa import RSAEncryption
+from key_pool import KeyPool
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk
+from gi.repository import Gtk, GLib
+
+# Ключи задач: повторный запрос вытесняет незавершенный
+KEYS_JOB = "keys"
+CIPHER_JOB = "cipher"
 
 
 class RSAApp:
-    def __init__(self):
+    def __init__(self, executor):
+        """executor - исполнитель фоновых задач (job_executor.JobExecutor с dispatch=GLib.idle_add)"""
         self.rsa = None
         self.encrypted_blocks = []
         self.public_key = {}
+        self.executor = executor
+        self.key_pool = KeyPool()
+        self._pulse_source = None
 
         # Создаем главное окно
         self.window = Gtk.Window(title="RSA Шифрование")
         self.window.set_default_size(800, 700)
         self.window.set_border_width(10)
-        self.window.connect("destroy", Gtk.main_quit)
+        self.window.connect("destroy", self.on_destroy)
 
         # Главный контейнер
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
@@ -41,6 +49,10 @@ class RSAApp:
         # Кнопки действий
         self.create_action_buttons(main_box)
 
+        # Индикатор фоновой задачи
+        self.progress_bar = Gtk.ProgressBar()
+        main_box.pack_start(self.progress_bar, False, False, 0)
+
         # Статус бар
         self.status_bar = Gtk.Statusbar()
         main_box.pack_start(self.status_bar, False, False, 0)
@@ -161,6 +173,11 @@ class RSAApp:
         clear_btn.connect("clicked", self.on_clear)
         button_box.pack_start(clear_btn, False, False, 0)
 
+        self.cancel_btn = Gtk.Button(label="Отмена")
+        self.cancel_btn.connect("clicked", self.on_cancel)
+        self.cancel_btn.set_sensitive(False)
+        button_box.pack_start(self.cancel_btn, False, False, 0)
+
     def update_status(self, message):
         context_id = self.status_bar.get_context_id("status")
         self.status_bar.push(context_id, message)
@@ -179,16 +196,27 @@ class RSAApp:
             if n_digits < 10:
                 self.show_error("Количество цифр должно быть не менее 10")
                 return
+        except ValueError:
+            self.show_error("Введите корректное число цифр")
+            return
 
-            self.update_status("Генерация ключей...")
+        # Ключ берется из пула; если пул пуст, поиск простых выполняется
+        # в фоне, окно не блокируется
+        self._start_job(
+            KEYS_JOB, "Генерация ключей...", lambda job: self.key_pool.acquire(n_digits),
+            on_done=self._on_keys_generated,
+            on_error=lambda e: self.show_error(f"Ошибка при генерации ключей: {str(e)}"),
+        )
 
-            # Генерация RSA ключей
-            self.rsa = RSAEncryption(n_digits)
-            key_info = self.rsa.get_key_info()
+    def _on_keys_generated(self, rsa):
+        """Отображение сгенерированных в фоне ключей"""
+        self._stop_progress()
+        self.rsa = rsa
+        key_info = self.rsa.get_key_info()
 
-            # Отображение информации о ключах
-            keys_buffer = self.keys_text.get_buffer()
-            keys_text = f"""P: {key_info["p"]}
+        # Отображение информации о ключах
+        keys_buffer = self.keys_text.get_buffer()
+        keys_text = f"""P: {key_info["p"]}
 
 Q: {key_info["q"]}
 
@@ -201,95 +229,130 @@ Q: {key_info["q"]}
 
 Закрытая экспонента d: {key_info["private_exponent"]}
 
+Расшифрование по КТО: {"да" if key_info["crt_enabled"] else "нет"}
+
 Размер блока: {key_info["block_size_bytes"]} байт"""
 
-            keys_buffer.set_text(keys_text)
+        keys_buffer.set_text(keys_text)
 
-            # Активируем кнопки
-            self.encrypt_btn.set_sensitive(True)
-            self.decrypt_btn.set_sensitive(True)
+        # Активируем кнопки
+        self.encrypt_btn.set_sensitive(True)
+        self.decrypt_btn.set_sensitive(True)
 
-            self.update_status("Ключи успешно сгенерированы")
-
-        except ValueError:
-            self.show_error("Введите корректное число цифр")
-        except Exception as e:
-            self.show_error(f"Ошибка при генерации ключей: {str(e)}")
+        self.update_status("Ключи успешно сгенерированы")
 
     def on_encrypt(self, widget):
         if not self.rsa:
             self.show_error("Сначала сгенерируйте ключи")
             return
 
-        try:
-            # Получаем исходный текст
-            plaintext = self.get_buffer_text(self.input_text)
+        # Получаем исходный текст
+        plaintext = self.get_buffer_text(self.input_text)
 
-            if not plaintext.strip():
-                self.show_error("Введите текст для шифрования")
-                return
+        if not plaintext.strip():
+            self.show_error("Введите текст для шифрования")
+            return
 
-            self.update_status("Шифрование...")
+        rsa = self.rsa
+        self._start_job(
+            CIPHER_JOB, "Шифрование...", lambda job: rsa.encrypt(plaintext),
+            on_done=lambda result: self._on_encrypted(plaintext, *result),
+            on_error=lambda e: self.show_error(f"Ошибка при шифровании: {str(e)}"),
+        )
 
-            # Шифруем текст
-            self.encrypted_blocks, self.public_key = self.rsa.encrypt(plaintext)
+    def _on_encrypted(self, plaintext, encrypted_blocks, public_key):
+        """Отображение результата фонового шифрования"""
+        self._stop_progress()
+        self.encrypted_blocks, self.public_key = encrypted_blocks, public_key
 
-            # Отображаем зашифрованные блоки
-            encrypted_buffer = self.encrypted_text.get_buffer()
-            encrypted_text = json.dumps(self.encrypted_blocks)
-            encrypted_buffer.set_text(encrypted_text)
+        # Отображаем зашифрованные блоки
+        encrypted_buffer = self.encrypted_text.get_buffer()
+        encrypted_text = json.dumps(self.encrypted_blocks)
+        encrypted_buffer.set_text(encrypted_text)
 
-            # Обновляем информацию
-            info_buffer = self.info_text.get_buffer()
-            info_text = f"""Текст успешно зашифрован!
+        # Обновляем информацию
+        info_buffer = self.info_text.get_buffer()
+        info_text = f"""Текст успешно зашифрован!
 Количество блоков: {len(self.encrypted_blocks)}
 Размер исходного текста: {len(plaintext)} символов
 Открытый ключ: (e={self.public_key["e"]}, n={self.public_key["n"]})"""
 
-            info_buffer.set_text(info_text)
-            self.update_status("Текст успешно зашифрован")
-
-        except Exception as e:
-            self.show_error(f"Ошибка при шифровании: {str(e)}")
+        info_buffer.set_text(info_text)
+        self.update_status("Текст успешно зашифрован")
 
     def on_decrypt(self, widget):
         if not self.rsa:
             self.show_error("Сначала сгенерируйте ключи")
             return
 
-        try:
-            # Получаем зашифрованные блоки
-            encrypted_text = self.get_buffer_text(self.encrypted_text)
+        # Получаем зашифрованные блоки
+        encrypted_text = self.get_buffer_text(self.encrypted_text)
 
-            if not encrypted_text.strip():
-                self.show_error("Нет данных для расшифровки")
-                return
-
-            self.update_status("Расшифровка...")
+        if not encrypted_text.strip():
+            self.show_error("Нет данных для расшифровки")
+            return
 
-            # Парсим блоки
+        # Парсим блоки
+        try:
             encrypted_blocks = json.loads(encrypted_text)
+        except json.JSONDecodeError:
+            self.show_error("Неверный формат зашифрованных блоков")
+            return
 
-            # Расшифровываем
-            decrypted_text = self.rsa.decrypt(encrypted_blocks)
-
-            # Отображаем результат
-            result_buffer = self.result_text.get_buffer()
-            result_buffer.set_text(decrypted_text)
+        rsa = self.rsa
+        self._start_job(
+            CIPHER_JOB, "Расшифровка...", lambda job: rsa.decrypt(encrypted_blocks),
+            on_done=lambda text: self._on_decrypted(text, len(encrypted_blocks)),
+            on_error=lambda e: self.show_error(f"Ошибка при расшифровке: {str(e)}"),
+        )
 
-            # Обновляем информацию
-            info_buffer = self.info_text.get_buffer()
-            info_text = f"""Текст успешно расшифрован!
-Длина текста: {len(decrypted_text)} символов
-Количество блоков: {len(encrypted_blocks)}"""
+    def _on_decrypted(self, decrypted_text, block_count):
+        """Отображение результата фонового расшифрования"""
+        self._stop_progress()
 
-            info_buffer.set_text(info_text)
-            self.update_status("Текст успешно расшифрован")
+        # Отображаем результат
+        result_buffer = self.result_text.get_buffer()
+        result_buffer.set_text(decrypted_text)
 
-        except json.JSONDecodeError:
-            self.show_error("Неверный формат зашифрованных блоков")
-        except Exception as e:
-            self.show_error(f"Ошибка при расшифровке: {str(e)}")
+        # Обновляем информацию
+        info_buffer = self.info_text.get_buffer()
+        info_text = f"""Текст успешно расшифрован!
+Длина текста: {len(decrypted_text)} символов
+Количество блоков: {block_count}"""
+
+        info_buffer.set_text(info_text)
+        self.update_status("Текст успешно расшифрован")
+
+    def _start_job(self, key, status, func, on_done, on_error):
+        """Запуск задачи в общем исполнителе с индикатором активности"""
+        self.update_status(status)
+        self.cancel_btn.set_sensitive(True)
+        if self._pulse_source is None:
+            self._pulse_source = GLib.timeout_add(100, self._pulse)
+        self.executor.submit(key, func, on_done=on_done, on_error=on_error)
+
+    def _pulse(self):
+        """Анимация индикатора, пока есть фоновые задачи"""
+        self.progress_bar.pulse()
+        return True
+
+    def _stop_progress(self):
+        """Остановка индикатора, если фоновых задач не осталось"""
+        if self.executor.is_busy(KEYS_JOB) or self.executor.is_busy(CIPHER_JOB):
+            return
+        if self._pulse_source is not None:
+            GLib.source_remove(self._pulse_source)
+            self._pulse_source = None
+        self.progress_bar.set_fraction(0.0)
+        self.cancel_btn.set_sensitive(False)
+
+    def on_cancel(self, widget):
+        """Отмена фоновых задач: их результаты будут отброшены"""
+        cancelled = self.executor.cancel(KEYS_JOB)
+        cancelled = self.executor.cancel(CIPHER_JOB) or cancelled
+        self._stop_progress()
+        if cancelled:
+            self.update_status("Операция отменена")
 
     def on_test(self, widget):
         """Тестовый пример"""
@@ -302,6 +365,11 @@ Test message in Russian and English!"""
         self.update_status("Загружен тестовый пример")
 
     def on_clear(self, widget):
+        # Результаты незавершенных задач больше не нужны
+        self.executor.cancel(KEYS_JOB)
+        self.executor.cancel(CIPHER_JOB)
+        self._stop_progress()
+
         # Очищаем все текстовые поля
         self.keys_text.get_buffer().set_text("")
         self.input_text.get_buffer().set_text("")
@@ -320,6 +388,7 @@ Test message in Russian and English!"""
         self.update_status("Все поля очищены")
 
     def show_error(self, message):
+        self._stop_progress()
         dialog = Gtk.MessageDialog(
             transient_for=self.window,
             flags=0,
@@ -331,7 +400,14 @@ Test message in Russian and English!"""
         dialog.destroy()
         self.update_status(f"Ошибка: {message}")
 
+    def on_destroy(self, widget):
+        self.executor.shutdown()
+        self.key_pool.close()
+        Gtk.main_quit()
+
     def run(self):
+        # Ключи размера по умолчанию готовятся заранее
+        self.key_pool.ensure(int(self.digits_entry.get_text()))
         self.window.show_all()
         self.update_status("Готов к работе")
         Gtk.main()
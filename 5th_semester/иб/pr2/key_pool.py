@@ -0,0 +1,140 @@
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Optional, Tuple
+
+from rsa import RSAEncryption
+
+# Ключ размера: ("bits", 2048) или ("digits", 31)
+SizeKey = Tuple[str, int]
+
+
+def _size_key(n_digits: int = 31, n_bits: Optional[int] = None) -> SizeKey:
+    """Нормализация размера ключа так же, как в конструкторе RSAEncryption"""
+    return ("bits", n_bits) if n_bits is not None else ("digits", n_digits)
+
+
+def _generate_primes(key: SizeKey) -> Tuple[int, int]:
+    """Задача пула процессов: поиск пары простых для ключа заданного размера"""
+    unit, size = key
+    rsa = RSAEncryption(n_bits=size) if unit == "bits" else RSAEncryption(n_digits=size)
+    return rsa.p, rsa.q
+
+
+class KeyPool:
+    """
+    Пул заранее сгенерированных ключей RSA
+
+    Для каждого запрошенного размера держится per_size готовых пар простых;
+    пополнение идет в фоновом пуле процессов, поэтому выдача ключа (acquire)
+    - это извлечение из очереди за O(1) без поиска простых. Если очередь
+    пуста, ключ генерируется сразу в вызывающем потоке.
+
+    При заданном spill_path готовые пары сохраняются в файл при close() и
+    загружаются при создании пула. Файл содержит закрытые ключи и
+    создается с правами только для владельца.
+    """
+
+    def __init__(self, per_size: int = 4, workers: Optional[int] = None,
+                 spill_path: Optional[str] = None):
+        self.per_size = per_size
+        self.workers = workers
+        self.spill_path = spill_path
+        self.stats = {"hits": 0, "misses": 0, "generated": 0}
+        self._ready: Dict[SizeKey, Deque[Tuple[int, int]]] = {}
+        self._in_flight: Dict[SizeKey, int] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+
+        if spill_path and os.path.exists(spill_path):
+            self._load_spill()
+
+    def acquire(self, n_digits: int = 31, n_bits: Optional[int] = None) -> RSAEncryption:
+        """Выдача готового ключа заданного размера"""
+        key = _size_key(n_digits, n_bits)
+        with self._lock:
+            ready = self._ready.setdefault(key, deque())
+            primes = ready.popleft() if ready else None
+            self.stats["hits" if primes else "misses"] += 1
+        self._refill(key)
+
+        if primes is None:
+            primes = _generate_primes(key)
+        return RSAEncryption.from_primes(*primes, n_bits=n_bits)
+
+    def ensure(self, n_digits: int = 31, n_bits: Optional[int] = None) -> None:
+        """Запуск заполнения пула для размера заранее, до первого запроса"""
+        key = _size_key(n_digits, n_bits)
+        with self._lock:
+            self._ready.setdefault(key, deque())
+        self._refill(key)
+
+    def available(self, n_digits: int = 31, n_bits: Optional[int] = None) -> int:
+        """Количество готовых ключей заданного размера"""
+        with self._lock:
+            return len(self._ready.get(_size_key(n_digits, n_bits), ()))
+
+    def close(self) -> None:
+        """Остановка фоновой генерации и сохранение готовых ключей на диск"""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if self.spill_path:
+            self._save_spill()
+
+    def _refill(self, key: SizeKey) -> None:
+        """Постановка задач генерации, пока готовых и ожидаемых меньше per_size"""
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.per_size - len(self._ready[key]) - self._in_flight.get(key, 0)
+            if missing <= 0:
+                return
+            if self._executor is None:
+                # spawn: рабочие процессы не наследуют потоки GTK-приложения
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            self._in_flight[key] = self._in_flight.get(key, 0) + missing
+            executor = self._executor
+
+        for _ in range(missing):
+            future = executor.submit(_generate_primes, key)
+            future.add_done_callback(lambda done, key=key: self._on_generated(key, done))
+
+    def _on_generated(self, key: SizeKey, future: Future) -> None:
+        """Прием пары простых из рабочего процесса"""
+        with self._lock:
+            self._in_flight[key] -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._ready[key].append(future.result())
+            self.stats["generated"] += 1
+        self._refill(key)
+
+    def _save_spill(self) -> None:
+        """Запись готовых пар простых в файл spill_path"""
+        with self._lock:
+            data = [
+                {"unit": unit, "size": size, "primes": [list(pair) for pair in ready]}
+                for (unit, size), ready in self._ready.items() if ready
+            ]
+        fd = os.open(self.spill_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as output:
+            json.dump(data, output)
+
+    def _load_spill(self) -> None:
+        """Загрузка пар простых, сохраненных предыдущим запуском"""
+        with open(self.spill_path, encoding="utf-8") as source:
+            data = json.load(source)
+        for entry in data:
+            ready = self._ready.setdefault((entry["unit"], entry["size"]), deque())
+            ready.extend(tuple(pair) for pair in entry["primes"])
+        # Каждая пара выдается один раз: после загрузки файл больше не нужен
+        os.remove(self.spill_path)
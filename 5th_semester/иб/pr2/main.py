@@ -1,6 +1,25 @@
+import importlib.util
+import os
+
 from gui import RSAApp
+from gi.repository import GLib
+
+
+def load_job_executor():
+    """
+    Загрузка общего модуля job_executor.py из родительского каталога
+
+    Модуль загружается по пути к файлу, sys.path не изменяется.
+    """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "job_executor.py")
+    spec = importlib.util.spec_from_file_location("job_executor", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 
 if __name__ == "__main__":
-    app = RSAApp()
+    job_executor = load_job_executor()
+    app = RSAApp(executor=job_executor.JobExecutor(dispatch=GLib.idle_add))
     app.run()
 
@@ -1,35 +1,227 @@
+import bisect
+import itertools
+import multiprocessing
 import random
 import math
 import os
-from typing import Tuple, List
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Tuple, List, Optional
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# Криптографически стойкий генератор для поиска простых чисел
+_random = random.SystemRandom()
+
+# Граница малых простых для предварительного отсева кандидатов
+SMALL_PRIME_LIMIT = 2000
+
+# Основания, при которых тест Миллера-Рабина точен для чисел меньше границы
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+DETERMINISTIC_LIMIT = 3317044064679887385961981
+
+
+def _sieve_primes(limit: int) -> List[int]:
+    """Простые числа меньше limit (решето Эратосфена на bytearray)"""
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+
+SMALL_PRIMES = _sieve_primes(SMALL_PRIME_LIMIT)
+
+# Простые для просеивания окна кандидатов (около пяти тысяч, без двойки)
+SIEVE_PRIMES = _sieve_primes(50000)[1:]
+
+# Просеивание окупается только для больших кандидатов: для меньших
+# простые ищутся случайным перебором
+SIEVE_MIN_BITS = 256
+
+# Граница простых для просеивания на один бит кандидата
+SIEVE_PRIMES_PER_BIT = 64
+
+# Число нечетных кандидатов в одном окне просеивания
+SIEVE_WINDOW = 4096
+
+PRIME_SEARCH_MODES = ("sieve", "random")
+
+# Допустимое число простых множителей модуля
+PRIME_COUNTS = (2, 3, 4)
+
+# Объем пакета (блоки × биты модуля), ниже которого блоки обрабатываются
+# в текущем процессе: передача в пул дороже самих возведений в степень
+BATCH_MIN_WORK = 64 * 2048
+
+# Наименьший объем одной порции для процесса пула (в тех же единицах)
+BATCH_MIN_CHUNK_WORK = BATCH_MIN_WORK // 4
+
+# Гибридный режим: длина сеансового ключа AES-GCM и одноразового числа
+SESSION_KEY_BYTES = 32
+NONCE_BYTES = 12
+
+
+# Пулы процессов для пакетных операций по числу процессов; создаются при
+# первом пакете и живут до завершения программы
+_batch_pools: Dict[int, ProcessPoolExecutor] = {}
+_batch_pools_lock = threading.Lock()
+
+
+def _shared_batch_pool(workers: int) -> ProcessPoolExecutor:
+    """Общий пул процессов для пакетных операций всех ключей"""
+    with _batch_pools_lock:
+        pool = _batch_pools.get(workers)
+        if pool is None:
+            # spawn: рабочие процессы не наследуют потоки GTK-приложения
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _batch_pools[workers] = pool
+        return pool
+
+
+def _encrypt_chunk(blocks: List[int], key: "RSAEncryption") -> List[int]:
+    """Задача пула: шифрование порции блоков открытым ключом"""
+    return [pow(block, key.e, key.n) for block in blocks]
+
+
+def _decrypt_chunk(blocks: List[int], key: "RSAEncryption") -> List[int]:
+    """Задача пула: расшифрование порции блоков закрытым ключом"""
+    return [key._decrypt_block(block) for block in blocks]
+
 
 class RSAEncryption:
-    def __init__(self, n_digits: int = 31):
+    def __init__(self, n_digits: int = 31, n_bits: Optional[int] = None,
+                 prime_search: str = "sieve", use_crt: bool = True,
+                 prime_count: int = 2):
+        """
+        Генерация ключей RSA
+
+        Размер модуля задается числом десятичных цифр n_digits или, если
+        передан n_bits, точной длиной в битах (1024, 2048, 4096).
+        prime_search - способ поиска простых: "sieve" (просеивание окна
+        последовательных кандидатов, для простых короче SIEVE_MIN_BITS
+        используется перебор) или "random" (новое случайное число на
+        каждую попытку). use_crt - расшифрование по китайской теореме
+        об остатках. prime_count - число простых множителей модуля (2-4):
+        с 3-4 множителями операции закрытым ключом идут по меньшим модулям.
+        """
+        if prime_search not in PRIME_SEARCH_MODES:
+            raise ValueError(f"Неизвестный способ поиска простых: {prime_search}")
+        if prime_count not in PRIME_COUNTS:
+            raise ValueError(f"Число простых множителей должно быть от 2 до 4, получено: {prime_count}")
+        self.prime_search = prime_search
+        self.prime_count = prime_count
+        self.use_crt = use_crt
+        self.n_bits = n_bits
         self.n_digits = n_digits
-        self.p, self.q = self._generate_primes()
-        self.n = self.p * self.q
-        self.phi = (self.p - 1) * (self.q - 1)
+        self._setup_keys(*self._generate_primes())
+
+    @classmethod
+    def from_primes(cls, *primes: int, n_bits: Optional[int] = None,
+                    use_crt: bool = True) -> "RSAEncryption":
+        """
+        Ключи по заранее найденным простым P, Q и, для многопростого
+        режима, дополнительным множителям (без поиска простых)
+
+        n_bits указывается, если простые генерировались по длине в битах.
+        """
+        if len(primes) not in PRIME_COUNTS:
+            raise ValueError(f"Число простых множителей должно быть от 2 до 4, получено: {len(primes)}")
+        rsa = cls.__new__(cls)
+        rsa.prime_search = PRIME_SEARCH_MODES[0]
+        rsa.prime_count = len(primes)
+        rsa.use_crt = use_crt
+        rsa.n_bits = n_bits
+        rsa.n_digits = len(str(math.prod(primes)))
+        rsa._setup_keys(*primes)
+        return rsa
+
+    def _setup_keys(self, *primes: int) -> None:
+        """Вычисление модуля и экспонент по простым множителям"""
+        self.primes = list(primes)
+        self.p, self.q = primes[:2]
+        self.n = math.prod(primes)
+        if self.n_bits is not None:
+            self.n_digits = len(str(self.n))
+        self.phi = math.prod(prime - 1 for prime in primes)
         self.e = self._choose_public_exponent()
         self.d = self._calculate_private_key()
 
+        # Параметры расшифрования по китайской теореме об остатках
+        self.dp = self.d % (self.p - 1)
+        self.dq = self.d % (self.q - 1)
+        self.qinv = self._mod_inverse(self.q, self.p)
+
+        # Для 3-4 множителей (RFC 8017): каждому следующему простому r_i -
+        # экспонента d mod (r_i - 1) и коэффициент (r_1*...*r_(i-1))^-1 mod r_i
+        self.crt_extra = []
+        modulus = self.p * self.q
+        for prime in primes[2:]:
+            self.crt_extra.append((prime, self.d % (prime - 1), self._mod_inverse(modulus, prime)))
+            modulus *= prime
+
     def _is_prime(self, num: int) -> bool:
-        """Проверка числа на простоту"""
+        """
+        Проверка числа на простоту
+
+        Сначала кандидат делится на малые простые - так отсеивается
+        большинство составных чисел. Оставшиеся проверяются тестом
+        Миллера-Рабина: для чисел меньше DETERMINISTIC_LIMIT по
+        фиксированным основаниям (ответ точный), для больших - по случайным
+        основаниям, число раундов зависит от размера числа.
+        """
         if num < 2:
             return False
-        if num == 2:
+        for prime in SMALL_PRIMES:
+            if num % prime == 0:
+                return num == prime
+        if num < SMALL_PRIME_LIMIT * SMALL_PRIME_LIMIT:
             return True
-        if num % 2 == 0:
-            return False
-
-        # Упрощенная проверка для демонстрации
-        limit = int(math.isqrt(num)) + 1
-        for i in range(3, limit, 2):
-            if num % i == 0:
-                return False
-        return True
+        return self._miller_rabin(num)
+
+    def _miller_rabin(self, num: int) -> bool:
+        """Тест Миллера-Рабина для нечетного num без малых делителей"""
+        if num < DETERMINISTIC_LIMIT:
+            bases = DETERMINISTIC_BASES
+        else:
+            bases = [_random.randrange(2, num - 1) for _ in range(self._miller_rabin_rounds(num.bit_length()))]
+        return all(self._miller_rabin_round(num, base) for base in bases)
+
+    def _miller_rabin_round(self, num: int, base: int) -> bool:
+        """Один раунд теста Миллера-Рабина: False - число точно составное"""
+        d = num - 1
+        s = (d & -d).bit_length() - 1
+        d >>= s
+
+        x = pow(base, d, num)
+        if x == 1 or x == num - 1:
+            return True
+        for _ in range(s - 1):
+            x = x * x % num
+            if x == num - 1:
+                return True
+        return False
+
+    def _miller_rabin_rounds(self, bits: int) -> int:
+        """Число раундов для вероятности ошибки не выше 2^-100 (FIPS 186-4, C.3)"""
+        if bits >= 1536:
+            return 3
+        if bits >= 1024:
+            return 4
+        if bits >= 512:
+            return 7
+        return 40
+
+    def _generate_primes(self) -> Tuple[int, ...]:
+        """Генерация двух простых чисел P и Q (или prime_count множителей)"""
+        if self.prime_count > 2:
+            return self._generate_multi_primes()
+        if self.n_bits is not None:
+            return self._generate_primes_bits()
 
-    def _generate_primes(self) -> Tuple[int, int]:
-        """Генерация двух простых чисел P и Q"""
         # Для N с 31 цифрами, P и Q должны быть примерно по 15-16 цифр
         p_digits = self.n_digits // 2
         q_digits = self.n_digits - p_digits
@@ -41,21 +233,114 @@ class RSAEncryption:
         q_max = 10**q_digits - 1
 
         # Генерируем P
-        while True:
-            p = random.randint(p_min, p_max)
-            if self._is_prime(p):
-                break
+        p = self._random_prime(p_min, p_max)
 
         # Генерируем Q
         while True:
-            q = random.randint(q_min, q_max)
-            if self._is_prime(q) and p != q:
+            q = self._random_prime(q_min, q_max)
+            if p != q:
                 n = p * q
                 if len(str(n)) == self.n_digits:
                     break
 
         return p, q
 
+    def _generate_primes_bits(self) -> Tuple[int, int]:
+        """Генерация P и Q, произведение которых занимает ровно n_bits бит"""
+        if self.n_bits < 32:
+            raise ValueError("Длина модуля должна быть не менее 32 бит")
+        p_bits = self.n_bits // 2
+        q_bits = self.n_bits - p_bits
+
+        # Два старших бита установлены, поэтому произведение двух таких
+        # чисел имеет длину ровно в сумму их длин
+        p = self._random_prime(0b11 << (p_bits - 2), (1 << p_bits) - 1)
+        while True:
+            q = self._random_prime(0b11 << (q_bits - 2), (1 << q_bits) - 1)
+            if q != p:
+                return p, q
+
+    def _generate_multi_primes(self) -> Tuple[int, ...]:
+        """
+        Генерация prime_count различных простых с произведением нужной длины
+
+        Все множители, кроме последнего, берутся равной длины; последний
+        выбирается из отрезка, при котором произведение точно попадает в
+        заданное число бит (или цифр).
+        """
+        count = self.prime_count
+        if self.n_bits is not None:
+            if self.n_bits < 16 * count:
+                raise ValueError(f"Длина модуля должна быть не менее {16 * count} бит")
+            total_min, total_max = 1 << (self.n_bits - 1), (1 << self.n_bits) - 1
+            part_bits = self.n_bits // count
+            part_min, part_max = 0b11 << (part_bits - 2), (1 << part_bits) - 1
+        else:
+            if self.n_digits < 5 * count:
+                raise ValueError(f"Модуль должен содержать не менее {5 * count} цифр")
+            total_min, total_max = 10 ** (self.n_digits - 1), 10**self.n_digits - 1
+            part_digits = self.n_digits // count
+            part_min, part_max = 10 ** (part_digits - 1), 10**part_digits - 1
+
+        while True:
+            primes = []
+            while len(primes) < count - 1:
+                prime = self._random_prime(part_min, part_max)
+                if prime not in primes:
+                    primes.append(prime)
+
+            product = math.prod(primes)
+            last_min, last_max = -(-total_min // product), total_max // product
+            if last_min > last_max:
+                continue
+            last = self._random_prime(last_min, last_max)
+            if last not in primes:
+                return tuple(primes + [last])
+
+    def _random_prime(self, low: int, high: int) -> int:
+        """Случайное простое число из отрезка [low, high]"""
+        if self.prime_search == "sieve" and high.bit_length() >= SIEVE_MIN_BITS:
+            return self._sieve_window_prime(low, high)
+        while True:
+            candidate = _random.randint(low, high)
+            if self._is_prime(candidate):
+                return candidate
+
+    def _sieve_window_prime(self, low: int, high: int) -> int:
+        """
+        Поиск простого числа просеиванием окна последовательных кандидатов
+
+        От случайной нечетной точки берется окно из SIEVE_WINDOW нечетных
+        чисел; кратные SIEVE_PRIMES вычеркиваются в bytearray срезами, и
+        полная проверка запускается только для уцелевших. Если окно
+        исчерпано, берется следующее; при выходе за high - новая точка.
+
+        Граница простых растет с размером кандидата (SIEVE_PRIMES_PER_BIT
+        на бит). Уцелевшие не делятся ни на одно из SMALL_PRIMES, поэтому
+        для них сразу запускается тест Миллера-Рабина.
+        """
+        limit = min(SIEVE_PRIMES_PER_BIT * high.bit_length(), SIEVE_PRIMES[-1] + 1)
+        sieve_primes = SIEVE_PRIMES[:bisect.bisect_left(SIEVE_PRIMES, limit)]
+        while True:
+            start = _random.randint(low, high) | 1
+            while start <= high:
+                # Позиция i окна соответствует числу start + 2i
+                window = bytearray([1]) * SIEVE_WINDOW
+                for prime in sieve_primes:
+                    # Первое i, при котором start + 2i делится на prime
+                    first = (prime - start % prime) * ((prime + 1) // 2) % prime
+                    if start + 2 * first == prime:
+                        first += prime
+                    window[first::prime] = bytes(len(range(first, SIEVE_WINDOW, prime)))
+
+                for i in range(SIEVE_WINDOW):
+                    candidate = start + 2 * i
+                    if candidate > high:
+                        break
+                    if window[i] and self._miller_rabin(candidate):
+                        return candidate
+                start += 2 * SIEVE_WINDOW
+
     def _gcd(self, a: int, b: int) -> int:
         """Наибольший общий делитель"""
         while b:
@@ -71,27 +356,39 @@ class RSAEncryption:
 
         # Если стандартные не подходят, ищем случайное
         while True:
-            e = random.randint(3, self.phi - 1)
+            e = _random.randint(3, self.phi - 1)
             if self._gcd(e, self.phi) == 1:
                 return e
 
     def _extended_gcd(self, a: int, b: int) -> Tuple[int, int, int]:
-        """Расширенный алгоритм Евклида"""
-        if a == 0:
-            return b, 0, 1
+        """
+        Расширенный алгоритм Евклида
+
+        Итеративная форма: глубина рекурсии не растет с размером чисел.
 
-        gcd, x1, y1 = self._extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        return gcd, x, y
+        Returns:
+            tuple: (gcd, x, y), где a*x + b*y = gcd
+        """
+        old_r, r = a, b
+        old_x, x = 1, 0
+        old_y, y = 0, 1
+        while r:
+            quotient = old_r // r
+            old_r, r = r, old_r - quotient * r
+            old_x, x = x, old_x - quotient * x
+            old_y, y = y, old_y - quotient * y
+        return old_r, old_x, old_y
+
+    def _mod_inverse(self, a: int, modulus: int) -> int:
+        """Обратный элемент a по модулю modulus"""
+        gcd, x, _ = self._extended_gcd(a % modulus, modulus)
+        if gcd != 1:
+            raise ValueError("Обратный элемент не существует")
+        return x % modulus
 
     def _calculate_private_key(self) -> int:
         """Вычисление закрытого ключа d"""
-        _, x, _ = self._extended_gcd(self.e, self.phi)
-        d = x % self.phi
-        if d < 0:
-            d += self.phi
-        return d
+        return self._mod_inverse(self.e, self.phi)
 
     def _calculate_block_size(self) -> int:
         """Вычисление размера блока для данных с учетом PKCS#1 дополнения"""
@@ -167,7 +464,10 @@ class RSAEncryption:
     def _text_to_blocks(self, text: str) -> List[int]:
         """Преобразование текста в числовые блоки с PKCS#1 дополнением"""
         # Кодируем текст в UTF-8
-        text_bytes = text.encode("utf-8")
+        return self._bytes_to_blocks(text.encode("utf-8"))
+
+    def _bytes_to_blocks(self, text_bytes: bytes) -> List[int]:
+        """Преобразование байтов в числовые блоки с PKCS#1 дополнением"""
         block_size = self._calculate_block_size()
 
         blocks = []
@@ -182,6 +482,10 @@ class RSAEncryption:
 
     def _blocks_to_text(self, blocks: List[int]) -> str:
         """Преобразование числовых блоков обратно в текст с удалением дополнения"""
+        return self._blocks_to_bytes(blocks).decode("utf-8", errors="replace")
+
+    def _blocks_to_bytes(self, blocks: List[int]) -> bytes:
+        """Преобразование числовых блоков обратно в байты с удалением дополнения"""
         bytes_list = bytearray()
 
         for block in blocks:
@@ -192,7 +496,7 @@ class RSAEncryption:
             except ValueError as e:
                 raise ValueError(f"Failed to unpad block: {e}")
 
-        return bytes_list.decode("utf-8", errors="replace")
+        return bytes(bytes_list)
 
     def _modular_pow(self, base: int, exponent: int, modulus: int) -> int:
         """Быстрое возведение в степень по модулю"""
@@ -226,11 +530,131 @@ class RSAEncryption:
         if not encrypted_blocks:
             return ""
 
-        decrypted_blocks = [
-            self._modular_pow(block, self.d, self.n) for block in encrypted_blocks
-        ]
+        decrypted_blocks = [self._decrypt_block(block) for block in encrypted_blocks]
         return self._blocks_to_text(decrypted_blocks)
 
+    def encrypt_hybrid(self, plaintext: str) -> dict:
+        """
+        Гибридное шифрование: текст - AES-GCM, RSA - только сеансовый ключ
+
+        Для каждого сообщения создается случайный 256-битный сеансовый
+        ключ; им шифруется весь текст, а сам ключ шифруется открытым
+        ключом RSA (один блок, если модуль не меньше 344 бит). Поэтому
+        стоимость RSA не зависит от длины сообщения.
+
+        Returns:
+            dict: key_blocks (зашифрованный сеансовый ключ), nonce,
+                  ciphertext (текст с тегом аутентификации)
+        """
+        session_key = AESGCM.generate_key(bit_length=SESSION_KEY_BYTES * 8)
+        nonce = os.urandom(NONCE_BYTES)
+        ciphertext = AESGCM(session_key).encrypt(nonce, plaintext.encode("utf-8"), None)
+
+        key_blocks = [pow(block, self.e, self.n) for block in self._bytes_to_blocks(session_key)]
+        return {"key_blocks": key_blocks, "nonce": nonce, "ciphertext": ciphertext}
+
+    def decrypt_hybrid(self, message: dict) -> str:
+        """
+        Расшифрование сообщения, полученного encrypt_hybrid
+
+        Поврежденный шифротекст или чужой ключ обнаруживаются по тегу
+        аутентификации GCM (исключение cryptography InvalidTag).
+        """
+        session_key = self._blocks_to_bytes(
+            [self._decrypt_block(block) for block in message["key_blocks"]]
+        )
+        if len(session_key) != SESSION_KEY_BYTES:
+            raise ValueError("Неверная длина сеансового ключа")
+        plaintext = AESGCM(session_key).decrypt(message["nonce"], message["ciphertext"], None)
+        return plaintext.decode("utf-8")
+
+    def encrypt_batch(self, messages: List[str], workers: Optional[int] = None,
+                      chunk_size: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> List[List[int]]:
+        """
+        Шифрование нескольких сообщений в пуле процессов
+
+        Блоки всех сообщений объединяются и делятся на порции по
+        chunk_size (по умолчанию - около четырех порций на процесс, но не
+        меньше BATCH_MIN_CHUNK_WORK бит модуля на порцию). Пакеты меньше
+        BATCH_MIN_WORK обрабатываются в текущем процессе. executor - пул
+        вызывающего кода; без него используется общий пул модуля, который
+        создается один раз. Порядок блоков и сообщений сохраняется.
+
+        Returns:
+            list: зашифрованные блоки каждого сообщения
+        """
+        block_lists = [self._text_to_blocks(message) if message else [] for message in messages]
+        return self._run_batch(_encrypt_chunk, block_lists, workers, chunk_size, executor)
+
+    def decrypt_batch(self, messages: List[List[int]], workers: Optional[int] = None,
+                      chunk_size: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> List[str]:
+        """
+        Расшифрование нескольких сообщений в пуле процессов
+
+        Returns:
+            list: тексты в порядке сообщений
+        """
+        decrypted = self._run_batch(_decrypt_chunk, messages, workers, chunk_size, executor)
+        return [self._blocks_to_text(blocks) if blocks else "" for blocks in decrypted]
+
+    def _run_batch(self, func, block_lists: List[List[int]], workers: Optional[int],
+                   chunk_size: Optional[int], executor: Optional[Executor]) -> List[List[int]]:
+        """Обработка блоков всех сообщений порциями и разбиение результата обратно"""
+        blocks = [block for block_list in block_lists for block in block_list]
+        workers = workers or os.cpu_count() or 1
+        key_bits = self.n.bit_length()
+        if chunk_size is None:
+            chunk_size = max(-(-BATCH_MIN_CHUNK_WORK // key_bits), -(-len(blocks) // (workers * 4)))
+
+        if workers <= 1 or len(blocks) * key_bits < BATCH_MIN_WORK or len(blocks) <= chunk_size:
+            # Пул процессов не окупается: все блоки в текущем процессе
+            processed = func(blocks, self)
+        else:
+            pool = executor or _shared_batch_pool(workers)
+            chunks = [blocks[i:i + chunk_size] for i in range(0, len(blocks), chunk_size)]
+            # Ключ передается с каждой порцией: пул общий для разных ключей
+            processed = [
+                block for chunk in pool.map(func, chunks, itertools.repeat(self, len(chunks)))
+                for block in chunk
+            ]
+
+        result = []
+        start = 0
+        for block_list in block_lists:
+            result.append(processed[start:start + len(block_list)])
+            start += len(block_list)
+        return result
+
+    def _decrypt_block(self, block: int) -> int:
+        """Расшифрование одного блока закрытым ключом"""
+        if self.use_crt:
+            return self._crt_decrypt_block(block)
+        return self._modular_pow(block, self.d, self.n)
+
+    def _crt_decrypt_block(self, block: int) -> int:
+        """
+        Расшифрование блока по китайской теореме об остатках
+
+        Вместо одной степени по модулю n считаются более короткие - по
+        модулю каждого простого множителя - и результат восстанавливается
+        формулой Гарнера.
+        """
+        m_p = pow(block, self.dp, self.p)
+        m_q = pow(block, self.dq, self.q)
+        h = self.qinv * (m_p - m_q) % self.p
+        message = m_q + h * self.q
+
+        # Остальные множители многопростого ключа присоединяются по очереди
+        modulus = self.p * self.q
+        for prime, exponent, coefficient in self.crt_extra:
+            m_i = pow(block, exponent, prime)
+            h = (m_i - message) * coefficient % prime
+            message += modulus * h
+            modulus *= prime
+        return message
+
     def get_key_info(self) -> dict:
         """Информация о ключах"""
         n_bits = self.n.bit_length()
@@ -239,12 +663,15 @@ class RSAEncryption:
         return {
             "p": self.p,
             "q": self.q,
+            "primes": self.primes,
+            "prime_count": len(self.primes),
             "n": self.n,
             "n_bits": n_bits,
             "n_bytes": k_bytes,
             "phi": self.phi,
             "public_exponent": self.e,
             "private_exponent": self.d,
+            "crt_enabled": self.use_crt,
             "n_digits": len(str(self.n)),
             "block_size_bytes": self._calculate_block_size(),
             "max_data_per_block": f"{self._calculate_block_size()} bytes",